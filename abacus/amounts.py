@@ -0,0 +1,87 @@
+"""Fixed-point amounts.
+
+Amounts are integers in minor units (for example, cents) in posting,
+balances, closing and NumPy arrays. Chart `scale` is the number of decimal
+places in one unit: with `scale=2` amount `12345` means `123.45`.
+`Decimal` values appear only when reading user input and showing reports.
+"""
+
+from dataclasses import fields, replace
+from decimal import Decimal, InvalidOperation
+
+from abacus.core import (
+    AbacusError,
+    AccountBalances,
+    Amount,
+    CompoundEntry,
+    Entry,
+    TrialBalance,
+)
+
+__all__ = ["to_minor", "to_decimal", "to_decimals", "entry_to_decimals"]
+
+
+def to_minor(value: str | int | Decimal, scale: int = 0) -> Amount:
+    """Convert `value` to integer minor units.
+
+    Floats are refused, use strings or `Decimal`. Raises error if `value`
+    has more decimal places than `scale` allows.
+    """
+    if isinstance(value, float):
+        raise AbacusError(f"Use string or Decimal for amount, not float: {value}")
+    if isinstance(value, int):
+        return value * 10**scale
+    try:
+        d = Decimal(value)
+    except InvalidOperation:
+        raise AbacusError(f"Not a number: {value}")
+    if not d.is_finite():
+        raise AbacusError(f"Not a number: {value}")
+    minor = d.scaleb(scale)
+    if minor != minor.to_integral_value():
+        raise AbacusError(f"Amount {value} has more than {scale} decimal places.")
+    return int(minor)
+
+
+def to_decimal(amount: Amount, scale: int = 0) -> Decimal | Amount:
+    """Convert minor units to `Decimal`, amounts are left as is if `scale` is 0."""
+    if scale == 0:
+        return amount
+    return Decimal(amount).scaleb(-scale)
+
+
+def entry_to_decimals(entry: Entry | CompoundEntry, scale: int = 0) -> dict:
+    """Return entry as dictionary with amounts converted to `Decimal`,
+    same shape as JSONL lines read by `bx ingest`."""
+    match entry:
+        case CompoundEntry(debits, credits):
+            return {
+                "debits": [[name, to_decimal(x, scale)] for name, x in debits],
+                "credits": [[name, to_decimal(x, scale)] for name, x in credits],
+            }
+        case Entry(debit, credit, amount):
+            return dict(debit=debit, credit=credit, amount=to_decimal(amount, scale))
+    raise AbacusError(f"Cannot convert {entry}")
+
+
+def to_decimals(statement, scale: int = 0):
+    """Return copy of trial balance, balance sheet or income statement
+    with amounts converted to `Decimal` for rendering."""
+    if scale == 0:
+        return statement
+    if isinstance(statement, TrialBalance):
+        return TrialBalance(
+            {
+                name: (to_decimal(d, scale), to_decimal(c, scale))
+                for name, (d, c) in statement.items()
+            }
+        )
+    return replace(
+        statement,
+        **{
+            f.name: AccountBalances(
+                {k: to_decimal(v, scale) for k, v in getattr(statement, f.name).items()}
+            )
+            for f in fields(statement)
+        },
+    )
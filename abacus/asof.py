@@ -0,0 +1,216 @@
+"""Account balances as of a date.
+
+Entries are dated by transaction date from metadata (see `abacus.meta`).
+An entry without a date takes the date of the previous dated entry,
+entries before the first dated entry are dated at the very beginning.
+
+Day index (`<store>.days`) keeps changes of net balances (debits minus
+credits) for each day with entries and cumulative net balances at the end
+of each month with entries, both as sparse dictionaries of accounts with
+nonzero values. Balances as of any date are found by binary search over
+months plus changes of at most one partial month, without replaying entries.
+Balances for entries that do not touch income summary account are kept
+as well to produce income statement.
+
+The index is extended with new entries when entries file was only
+appended to and is rebuilt from store otherwise.
+"""
+
+import datetime
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field
+
+from abacus.core import Amount, BalanceVector, Chart, CompoundEntry, Entry
+from abacus.entries_store import fingerprint
+from abacus.meta import RECORD, MetaStore, date_to_int
+from abacus.sqlite_store import SQLiteStore
+
+__all__ = ["DayIndex", "balances_as_of", "balances_between"]
+
+VERSION = 3
+ALL, WITHOUT_ISA = 0, 1
+
+
+def deltas(entry: Entry | CompoundEntry) -> list[tuple[str, Amount]]:
+    """Return changes of net balances by account name."""
+    if isinstance(entry, CompoundEntry):
+        return entry.debits + [(name, -x) for name, x in entry.credits]
+    return [(entry.debit, entry.amount), (entry.credit, -entry.amount)]
+
+
+def add_to(net: dict[str, Amount], changes: dict[str, Amount]) -> None:
+    """Add `changes` to sparse `net` balances, drop zero balances."""
+    for name, x in changes.items():
+        y = net.get(name, 0) + x
+        if y:
+            net[name] = y
+        else:
+            net.pop(name, None)
+
+
+@dataclass
+class DayIndex:
+    """Daily changes and month-end cumulative net balances.
+
+    `days` are sorted `YYYYMMDD` integers (0 for undated entries before
+    the first date), `changes[k][i]` are changes of net balances on `days[i]`.
+    `months` are sorted `YYYYMM` integers, `nets[k][j]` are net balances
+    after `months[j]`. Both are kept for all entries (k=0) and for entries
+    that do not touch income summary account (k=1).
+    """
+
+    isa: str
+    days: list[int] = field(default_factory=list)
+    changes: list[list[dict[str, Amount]]] = field(default_factory=lambda: [[], []])
+    months: list[int] = field(default_factory=list)
+    nets: list[list[dict[str, Amount]]] = field(default_factory=lambda: [[], []])
+    # store position and fingerprint the index is valid for
+    next_id: int = 0
+    size: int = 0
+    digest: str = ""
+    # bytes of metadata file read
+    meta_size: int = 0
+    last_date: int = 0
+
+    def at(self, day: int, k: int = ALL) -> dict[str, Amount]:
+        """Return net balances after `day` by account name."""
+        month = day // 100
+        j = bisect_left(self.months, month) - 1
+        net = dict(self.nets[k][j]) if j >= 0 else {}
+        start = bisect_left(self.days, month * 100)
+        for i in range(start, bisect_right(self.days, day)):
+            add_to(net, self.changes[k][i])
+        return net
+
+    def extend(self, store) -> "DayIndex":
+        """Add entries appended to `store` after `next_id`."""
+        records = list(MetaStore(store.path).records(self.meta_size))
+        dates = {id: d for id, d, _ in records if id >= self.next_id}
+        added: dict[int, list[dict[str, Amount]]] = {}
+        last_date = self.last_date
+        for id, entry in store.yield_entries_with_ids(self.next_id):
+            last_date = dates.get(id) or last_date
+            day = added.setdefault(last_date, [{}, {}])
+            without = self.isa not in entry.names()
+            for name, x in deltas(entry):
+                for k in (ALL, WITHOUT_ISA) if without else (ALL,):
+                    day[k][name] = day[k].get(name, 0) + x
+        for day in sorted(added):
+            self._add(day, added[day])
+        self.last_date = last_date
+        self.meta_size += len(records) * RECORD.size
+        self.next_id = store.next_id()
+        self.size = store.path.stat().st_size if store.path.exists() else 0
+        if self.size:
+            self.digest = fingerprint(store.path, self.size)
+        return self
+
+    def _add(self, day: int, changes: list[dict[str, Amount]]):
+        """Add changes on `day` to daily changes and to balances
+        after its month and every later month."""
+        i = bisect_left(self.days, day)
+        if i == len(self.days) or self.days[i] != day:
+            self.days.insert(i, day)
+            for k in (ALL, WITHOUT_ISA):
+                self.changes[k].insert(i, {})
+        month = day // 100
+        j = bisect_left(self.months, month)
+        if j == len(self.months) or self.months[j] != month:
+            self.months.insert(j, month)
+            for k in (ALL, WITHOUT_ISA):
+                self.nets[k].insert(j, dict(self.nets[k][j - 1]) if j else {})
+        for k in (ALL, WITHOUT_ISA):
+            add_to(self.changes[k][i], changes[k])
+            # usually the last month, earlier only for backdated entries
+            for net in self.nets[k][j:]:
+                add_to(net, changes[k])
+
+    def is_valid_for(self, store, isa: str) -> bool:
+        """Return True if store was only appended to since index was saved."""
+        if self.isa != isa:
+            return False
+        if isinstance(store, SQLiteStore):
+            # transactions are never changed, only added with larger numbers
+            return store.next_id() >= self.next_id
+        if self.size == 0:
+            return True
+        if not store.path.exists() or store.path.stat().st_size < self.size:
+            return False
+        return fingerprint(store.path, self.size) == self.digest
+
+    def is_valid_for_meta(self, store) -> bool:
+        """Return False if metadata file is shorter than the part already read."""
+        path = MetaStore(store.path).meta_path
+        size = path.stat().st_size if path.exists() else 0
+        return size >= self.meta_size
+
+
+def index_path(store):
+    return store.path.with_name(store.path.name + ".days")
+
+
+def read_index(store) -> DayIndex | None:
+    try:
+        content = json.loads(index_path(store).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if content.pop("version", None) != VERSION:
+        return None
+    return DayIndex(**content)
+
+
+def save_index(store, index: DayIndex) -> None:
+    content = dict(version=VERSION, **asdict(index))
+    index_path(store).write_text(json.dumps(content), encoding="utf-8")
+
+
+def load_index(chart: Chart, store) -> DayIndex:
+    """Return day index updated with new entries, save it if it changed."""
+    isa = chart.income_summary_account
+    index = read_index(store)
+    if (
+        index is None
+        or not index.is_valid_for(store, isa)
+        or not index.is_valid_for_meta(store)
+    ):
+        index = DayIndex(isa)
+    stamp = (index.next_id, index.size)
+    index.extend(store)
+    if (index.next_id, index.size) != stamp or not index_path(store).exists():
+        save_index(store, index)
+    return index
+
+
+def vectors(chart: Chart, nets: list[dict[str, Amount]]) -> list[BalanceVector]:
+    compiled = chart.compiled()
+    return [BalanceVector(compiled).add_net(net) for net in nets]
+
+
+def balances_as_of(
+    chart: Chart, store, date: datetime.date
+) -> tuple[BalanceVector, BalanceVector]:
+    """Return balances of all entries and of entries that do not touch
+    income summary account, posted on or before `date`."""
+    index = load_index(chart, store)
+    day = date_to_int(date)
+    all_entries, without_isa = vectors(
+        chart, [index.at(day, ALL), index.at(day, WITHOUT_ISA)]
+    )
+    return all_entries, without_isa
+
+
+def balances_between(
+    chart: Chart, store, start: datetime.date, end: datetime.date
+) -> tuple[BalanceVector, BalanceVector]:
+    """Same as `balances_as_of()` for entries dated from `start` to `end`."""
+    index = load_index(chart, store)
+    a, b = date_to_int(start - datetime.timedelta(days=1)), date_to_int(end)
+
+    def between(k):
+        before = index.at(a, k)
+        net = index.at(b, k)
+        return {n: net.get(n, 0) - before.get(n, 0) for n in set(net) | set(before)}
+
+    all_entries, without_isa = vectors(chart, [between(ALL), between(WITHOUT_ISA)])
+    return all_entries, without_isa
@@ -0,0 +1,240 @@
+"""Write and read accounting entries from a compact binary file.
+
+File layout:
+
+- header of `capacity` bytes: magic string, capacity, length of account
+  names block and the block itself (JSON list of account names),
+- fixed-width records, one per entry: debit account id, credit account id,
+  amount and title offset (-1 if there is no title).
+
+Account ids are positions in the account names list of the header.
+Records can be read with `BinaryStore.arrays()` into NumPy arrays
+without copying (requires `numpy`). Records are double entries,
+compound entries must be split with `CompoundEntry.to_entries()`.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar, Iterable
+
+from abacus.core import AbacusError, Entry, to_double_entries
+
+__all__ = ["BinaryStore", "convert"]
+
+MAGIC = b"ABXLOG01"
+# magic string, header capacity, names block length
+PREFIX = struct.Struct("<8sII")
+# debit id, credit id, amount, title offset
+RECORD = struct.Struct("<IIqq")
+RECORD_DTYPE = [
+    ("debit_id", "<u4"),
+    ("credit_id", "<u4"),
+    ("amount", "<i8"),
+    ("title", "<i8"),
+]
+INITIAL_CAPACITY = 4096
+
+
+@dataclass
+class Header:
+    capacity: int
+    names: list[str]
+
+    def encode(self) -> bytes:
+        block = json.dumps(self.names, ensure_ascii=False).encode("utf-8")
+        prefix = PREFIX.pack(MAGIC, self.capacity, len(block))
+        return (prefix + block).ljust(self.capacity, b"\0")
+
+    def fits(self) -> bool:
+        block = json.dumps(self.names, ensure_ascii=False).encode("utf-8")
+        return PREFIX.size + len(block) <= self.capacity
+
+    @classmethod
+    def read(cls, file) -> "Header":
+        file.seek(0)
+        magic, capacity, length = PREFIX.unpack(file.read(PREFIX.size))
+        if magic != MAGIC:
+            raise AbacusError(f"Not a binary entries file: {file.name}")
+        names = json.loads(file.read(length).decode("utf-8"))
+        return cls(capacity, names)
+
+
+@dataclass
+class BinaryStore:
+    path: Path
+    store_format: ClassVar[str] = "binary"
+
+    @classmethod
+    def load(cls, path: Path | str | None = None):
+        if path is None:
+            path = Path("./entries.bin")
+        return cls(Path(path))
+
+    def _is_empty(self) -> bool:
+        return not self.path.exists() or self.path.stat().st_size == 0
+
+    def header(self) -> Header:
+        if self._is_empty():
+            return Header(INITIAL_CAPACITY, [])
+        with open(self.path, "rb") as file:
+            return Header.read(file)
+
+    @property
+    def names(self) -> list[str]:
+        """Interned account names, account id is position in this list."""
+        return self.header().names
+
+    def __len__(self) -> int:
+        """Number of records in file."""
+        if self._is_empty():
+            return 0
+        return (self.path.stat().st_size - self.header().capacity) // RECORD.size
+
+    def append(self, entry: Entry) -> None:
+        self.append_many([entry])
+
+    def next_id(self) -> int:
+        """Id of next appended entry, its record number."""
+        return len(self)
+
+    def append_many(self, entries: Iterable[Entry]) -> int:
+        """Append entries, return id of the first one."""
+        first = self.next_id()
+        header = self.header()
+        names_before = len(header.names)
+        index = {name: i for i, name in enumerate(header.names)}
+
+        def intern(name: str) -> int:
+            if name not in index:
+                index[name] = len(header.names)
+                header.names.append(name)
+            return index[name]
+
+        def pack(e: Entry) -> bytes:
+            if not isinstance(e, Entry):
+                raise AbacusError(f"Binary store keeps double entries only: {e}")
+            return RECORD.pack(intern(e.debit), intern(e.credit), e.amount, -1)
+
+        records = b"".join(pack(e) for e in entries)
+        if self._is_empty():
+            self._rewrite(header)
+        elif len(header.names) != names_before:
+            self._write_header(header)
+        with open(self.path, "ab") as file:
+            file.write(records)
+        return first
+
+    def _write_header(self, header: Header) -> None:
+        if header.fits():
+            with open(self.path, "r+b") as file:
+                file.write(header.encode())
+        else:
+            self._rewrite(header)
+
+    def _rewrite(self, header: Header) -> None:
+        """Write file with larger header and records of current file copied
+        after it. New file is written next to the old one and replaces it,
+        so the old file stays intact if writing fails."""
+        while not header.fits():
+            header.capacity *= 2
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as target:
+                target.write(header.encode())
+                if not self._is_empty():
+                    with open(self.path, "rb") as source:
+                        source.seek(Header.read(source).capacity)
+                        shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def yield_entries(self) -> Iterable[Entry]:
+        for _, entry in self.yield_entries_with_ids():
+            yield entry
+
+    def yield_entries_with_ids(self, start: int = 0) -> Iterable[tuple[int, Entry]]:
+        """Yield record numbers and entries starting from record `start`."""
+        if self._is_empty():
+            return
+        with open(self.path, "rb") as file:
+            header = Header.read(file)
+            begin = header.capacity + start * RECORD.size
+            if self.path.stat().st_size <= begin:
+                return
+            names = header.names
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)[begin:]
+                try:
+                    records = RECORD.iter_unpack(view)
+                    for i, (d, c, amount, _) in enumerate(records, start):
+                        yield i, Entry(names[d], names[c], amount)
+                finally:
+                    view.release()
+
+    def entry_at(self, id: int) -> Entry:
+        """Read entry with id `id` (record number)."""
+        with open(self.path, "rb") as file:
+            header = Header.read(file)
+            file.seek(header.capacity + id * RECORD.size)
+            d, c, amount, _ = RECORD.unpack(file.read(RECORD.size))
+        return Entry(header.names[d], header.names[c], amount)
+
+    def fold(self, key: str, vectors: list, post, every: int = 0) -> list:
+        """Fold all entries into balance `vectors` using `post` function.
+        Same interface as `LineJSON.fold()`, binary file does not use checkpoints."""
+        for entry in self.yield_entries():
+            post(entry)
+        return vectors
+
+    def arrays(self):
+        """Return debit ids, credit ids and amounts as NumPy arrays
+        mapped to file without copying."""
+        import numpy as np
+
+        header = self.header()
+        if len(self) == 0:
+            records = np.zeros(0, dtype=RECORD_DTYPE)
+        else:
+            records = np.memmap(
+                self.path, dtype=RECORD_DTYPE, mode="r", offset=header.capacity
+            )
+        return records["debit_id"], records["credit_id"], records["amount"]
+
+    def post_to(self, ledger):
+        """Post all records to `ColumnarLedger` in one vectorized pass."""
+        import numpy as np
+
+        debit_id, credit_id, amount = self.arrays()
+        # map ids in this file to ids in ledger
+        to_ledger = ledger.ids(self.names) if self.names else np.zeros(0, np.int64)
+        return ledger.post_arrays(to_ledger[debit_id], to_ledger[credit_id], amount)
+
+
+def convert(
+    source, target, batch_size: int = 100_000, null_account: str | None = None
+) -> None:
+    """Copy entries from `source` store to `target` store,
+    for example from `LineJSON` to `BinaryStore`. If `null_account` is given,
+    compound entries are split into double entries with this account."""
+
+    def write(batch):
+        if null_account is not None:
+            batch = to_double_entries(batch, null_account)
+        target.append_many(batch)
+
+    batch = []
+    for entry in source.yield_entries():
+        batch.append(entry)
+        if len(batch) == batch_size:
+            write(batch)
+            batch = []
+    if batch:
+        write(batch)
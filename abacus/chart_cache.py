@@ -0,0 +1,134 @@
+"""Cache compiled chart next to chart file.
+
+Parsing `chart.json` with pydantic and validating the chart takes longer
+than posting an entry, so `load_chart()` keeps the compiled chart in
+a binary sidecar file (`chart.json.cache`, written with `marshal`)
+together with account titles used to rename accounts in reports.
+The cache is keyed by modification time and size of chart file,
+a cache hit restores the chart without parsing and validation.
+"""
+
+import marshal
+import os
+import sys
+from pathlib import Path
+
+from abacus import core
+from abacus.core import Account, Chart, CompiledChart, TAccount
+
+__all__ = ["load_chart", "load_chart_with_titles", "cache_path"]
+
+# change when cache layout changes
+VERSION = 3
+ACCOUNT_LISTS = ("assets", "capital", "liabilities", "income", "expenses")
+
+
+def cache_path(path: Path) -> Path:
+    return path.with_name(path.name + ".cache")
+
+
+def cache_key(path: Path) -> tuple:
+    stat = path.stat()
+    return (VERSION, sys.version_info[:2], stat.st_mtime_ns, stat.st_size)
+
+
+def dump(chart: Chart, titles: dict[str, str]) -> bytes:
+    compiled = chart.compiled()
+    accounts = {
+        key: [
+            (a.name, list(a.contra_accounts))
+            for a in map(Account.from_string, getattr(chart, key))
+        ]
+        for key in ACCOUNT_LISTS
+    }
+    return marshal.dumps(
+        (
+            compiled.names,
+            [t.__name__ for t in compiled.t_accounts],
+            compiled.contra_parent,
+            compiled.income_summary_account,
+            compiled.retained_earnings_account,
+            compiled.null_account,
+            compiled.scale,
+            accounts,
+            titles,
+        )
+    )
+
+
+def restore(data: bytes) -> tuple[Chart, dict[str, str]]:
+    (
+        names,
+        t_names,
+        contra_parent,
+        isa,
+        re,
+        null,
+        scale,
+        accounts,
+        titles,
+    ) = marshal.loads(data)
+    classes = {name: getattr(core, name) for name in set(t_names)}
+    if not all(issubclass(t, TAccount) for t in classes.values()):
+        raise ValueError("Not a T-account class in cache.")
+    t_accounts = [classes[name] for name in t_names]
+    compiled = CompiledChart(
+        names=names,
+        t_accounts=t_accounts,
+        is_debit=[issubclass(t, core.DebitAccount) for t in t_accounts],
+        contra_parent=contra_parent,
+        income_summary_account=isa,
+        retained_earnings_account=re,
+        null_account=null,
+        scale=scale,
+    )
+    chart = Chart.restore(
+        compiled,
+        **{
+            key: [Account(name, contra_names) for name, contra_names in items]
+            for key, items in accounts.items()
+        },
+    )
+    return chart, titles
+
+
+def read_cache(path: Path, key: tuple) -> tuple[Chart, dict[str, str]] | None:
+    try:
+        data = cache_path(path).read_bytes()
+        cached_key, payload = marshal.loads(data)
+        if tuple(cached_key) != key:
+            return None
+        return restore(payload)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def write_cache(path: Path, key: tuple, chart: Chart, titles: dict[str, str]) -> None:
+    target = cache_path(path)
+    temp = target.with_name(target.name + f".{os.getpid()}")
+    try:
+        temp.write_bytes(marshal.dumps((key, dump(chart, titles))))
+        os.replace(temp, target)
+    except OSError:
+        temp.unlink(missing_ok=True)
+
+
+def load_chart_with_titles(path: Path | str) -> tuple[Chart, dict[str, str]]:
+    """Return chart and account titles from cache if chart file did not
+    change, otherwise read chart file and update cache."""
+    path = Path(path)
+    key = cache_key(path)
+    cached = read_cache(path, key)
+    if cached is None:
+        from abacus.user_chart import UserChart  # imports pydantic
+
+        user_chart = UserChart.load(path)
+        cached = user_chart.chart(), dict(user_chart.rename_dict)
+        write_cache(path, key, *cached)
+    return cached
+
+
+def load_chart(path: Path | str) -> Chart:
+    """Return chart from cache if chart file did not change,
+    otherwise read chart file and update cache."""
+    return load_chart_with_titles(path)[0]
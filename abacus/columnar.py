@@ -0,0 +1,195 @@
+"""Columnar ledger that keeps account totals in NumPy arrays.
+
+Chart account names are compiled into integer ids and entries are posted
+as three integer arrays (debit ids, credit ids and amounts), so that all
+account totals are updated in one vectorized pass:
+
+```python
+ledger = ColumnarLedger.new(chart)
+ids = ledger.ids(["cash", "equity"])
+ledger.post_arrays(debit_id=[ids[0]], credit_id=[ids[1]], amount=[100])
+report = Report(chart, ledger)
+```
+
+`ColumnarLedger` provides `balances`, `subset()`, `subset_balances()`
+and `condense()`, so `TrialBalance.new()`, `BalanceSheet.new()`,
+`IncomeStatement.new()` and `Report` accept it in place of `Ledger`.
+
+Requires `numpy` (install with `pip install abacus-py[numpy]`).
+"""
+
+from typing import Iterable, Type
+
+import numpy as np
+
+from abacus.core import (
+    AbacusError,
+    AccountBalances,
+    Amount,
+    Chart,
+    CompoundEntry,
+    DebitAccount,
+    Entry,
+    Ledger,
+    TAccount,
+)
+
+__all__ = ["ColumnarLedger"]
+
+
+class ColumnarLedger:
+    """Ledger with debit totals, credit totals and posting counts
+    stored as NumPy arrays indexed by account id."""
+
+    def __init__(
+        self,
+        names: list[str],
+        t_accounts: list[Type[TAccount]],
+        debit_totals: np.ndarray | None = None,
+        credit_totals: np.ndarray | None = None,
+        counts: np.ndarray | None = None,
+    ):
+        n = len(names)
+        self.names = names
+        self.t_accounts = t_accounts
+        self.index = {name: i for i, name in enumerate(names)}
+        self.debit_totals = _zeros(n) if debit_totals is None else debit_totals
+        self.credit_totals = _zeros(n) if credit_totals is None else credit_totals
+        self.counts = _zeros(n) if counts is None else counts
+        self.revision = 0
+        # +1 for debit-side accounts, -1 for credit-side accounts
+        self.signs = np.array(
+            [1 if issubclass(t, DebitAccount) else -1 for t in t_accounts],
+            dtype=np.int64,
+        )
+
+    @classmethod
+    def new(cls, chart: Chart, balances: AccountBalances | None = None):
+        """Create a new columnar ledger from chart, possibly using starting balances."""
+        compiled = chart.compiled()
+        ledger = cls(names=compiled.names, t_accounts=compiled.t_accounts)
+        if balances:
+            entry = CompoundEntry.from_balances(chart, AccountBalances(balances))
+            ledger.post_many([entry])
+        return ledger
+
+    def __len__(self):
+        return len(self.names)
+
+    def version(self) -> int:
+        """Value that changes on every posting, used to invalidate cached reports."""
+        return self.revision
+
+    def ids(self, names: Iterable[str]) -> np.ndarray:
+        """Convert account names to account ids."""
+        try:
+            return np.array([self.index[name] for name in names], dtype=np.int64)
+        except KeyError as e:
+            raise AbacusError(f"Account not in chart: {e.args[0]}")
+
+    def encode(self, entries: Iterable[Entry | CompoundEntry]):
+        """Convert entries to arrays of debit leg ids, debit leg amounts,
+        credit leg ids and credit leg amounts."""
+        debit_id, debit_amount, credit_id, credit_amount = [], [], [], []
+        failed = []
+        index = self.index
+        for entry in entries:
+            try:
+                if isinstance(entry, CompoundEntry):
+                    debits = [(index[name], x) for name, x in entry.debits]
+                    credits = [(index[name], x) for name, x in entry.credits]
+                else:
+                    debits = [(index[entry.debit], entry.amount)]
+                    credits = [(index[entry.credit], entry.amount)]
+            except KeyError:
+                failed.append(entry)
+                continue
+            for i, x in debits:
+                debit_id.append(i)
+                debit_amount.append(x)
+            for i, x in credits:
+                credit_id.append(i)
+                credit_amount.append(x)
+        if failed:
+            raise AbacusError(failed)
+        return tuple(
+            np.array(xs, dtype=np.int64)
+            for xs in (debit_id, debit_amount, credit_id, credit_amount)
+        )
+
+    def post(self, debit: str, credit: str, amount: Amount, title: str = ""):
+        """Post to ledger using debit and credit account names and amount."""
+        return self.post_many([Entry(debit, credit, amount)])
+
+    def post_many(self, entries: Iterable[Entry | CompoundEntry]):
+        """Post several double or compound entries to ledger."""
+        return self.post_legs(*self.encode(entries))
+
+    def post_arrays(self, debit_id, credit_id, amount):
+        """Post entries given as arrays of debit ids, credit ids and amounts."""
+        if not (len(debit_id) == len(credit_id) == len(amount)):
+            raise AbacusError("Debit ids, credit ids and amounts must be same length.")
+        return self.post_legs(debit_id, amount, credit_id, amount)
+
+    def post_legs(self, debit_id, debit_amount, credit_id, credit_amount):
+        """Post debit legs and credit legs given as arrays of account ids
+        and amounts. Debit legs and credit legs may differ in number."""
+        debit_id = np.asarray(debit_id, dtype=np.int64)
+        credit_id = np.asarray(credit_id, dtype=np.int64)
+        debit_amount = np.asarray(debit_amount, dtype=np.int64)
+        credit_amount = np.asarray(credit_amount, dtype=np.int64)
+        if len(debit_id) != len(debit_amount) or len(credit_id) != len(credit_amount):
+            raise AbacusError("Account ids and amounts must be same length.")
+        n = len(self)
+        for ids in (debit_id, credit_id):
+            if len(ids) and (ids.min() < 0 or ids.max() >= n):
+                raise AbacusError("Account id out of range.")
+        # np.add.at is exact for int64, np.bincount would cast weights to float
+        np.add.at(self.debit_totals, debit_id, debit_amount)
+        np.add.at(self.credit_totals, credit_id, credit_amount)
+        self.counts += np.bincount(debit_id, minlength=n)
+        self.counts += np.bincount(credit_id, minlength=n)
+        self.revision += 1
+        return self
+
+    def balance_array(self) -> np.ndarray:
+        """Return account balances as array indexed by account id."""
+        return self.signs * (self.debit_totals - self.credit_totals)
+
+    @property
+    def balances(self) -> AccountBalances:
+        """Return account balances."""
+        values = self.balance_array().tolist()
+        return AccountBalances(dict(zip(self.names, values)))
+
+    def subset(self, cls: Type[TAccount]) -> "ColumnarLedger":
+        """Filter ledger by account type."""
+        mask = np.array([issubclass(t, cls) for t in self.t_accounts], dtype=bool)
+        positions = np.flatnonzero(mask).tolist()
+        return self.__class__(
+            names=[self.names[i] for i in positions],
+            t_accounts=[self.t_accounts[i] for i in positions],
+            debit_totals=self.debit_totals[mask],
+            credit_totals=self.credit_totals[mask],
+            counts=self.counts[mask],
+        )
+
+    def subset_balances(self, cls: Type[TAccount]) -> AccountBalances:
+        """Return balances of accounts of type `cls`."""
+        return self.subset(cls).balances
+
+    def condense(self) -> Ledger:
+        """Return a regular ledger with running totals accounts that hold
+        account balances. The result can be passed to `Pipeline`."""
+        return Ledger(
+            {
+                name: t(running_totals=True).topup(balance)
+                for name, t, balance in zip(
+                    self.names, self.t_accounts, self.balance_array().tolist()
+                )
+            }
+        )
+
+
+def _zeros(n: int) -> np.ndarray:
+    return np.zeros(n, dtype=np.int64)
@@ -23,10 +23,10 @@ Assumptions and simplifications:
 5. no checks for account non-negativity
 """
 
+import datetime
 import json
 from abc import ABC, abstractmethod
-from collections import UserDict
-from copy import deepcopy
+from collections import Counter, UserDict
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -51,7 +51,7 @@ class AbacusError(Exception):
     """Custom error for this project."""
 
 
-# FIXME: can use decimal.Decimal
+# integer number of minor units, see `abacus.amounts` and `Chart.scale`
 Amount = int
 
 
@@ -148,18 +148,38 @@ class Account:
 
 @dataclass
 class TAccount(ABC):
-    """T-account will hold amounts on debits and credit side."""
+    """T-account will hold amounts on debits and credit side.
+
+    Debit and credit totals and the number of postings are updated on every
+    posting, so that account balance is available without summing amounts.
+    With `running_totals=True` individual amounts are not kept at all.
+    """
 
     debits: list[Amount] = field(default_factory=list)
     credits: list[Amount] = field(default_factory=list)
+    running_totals: bool = False
+    debit_total: Amount = field(default=0, init=False, repr=False)
+    credit_total: Amount = field(default=0, init=False, repr=False)
+    count: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.debit_total = sum(self.debits)
+        self.credit_total = sum(self.credits)
+        self.count = len(self.debits) + len(self.credits)
 
     def debit(self, amount: Amount):
         """Add debit amount to account."""
-        self.debits.append(amount)
+        if not self.running_totals:
+            self.debits.append(amount)
+        self.debit_total += amount
+        self.count += 1
 
     def credit(self, amount: Amount):
         """Add credit amount to account."""
-        self.credits.append(amount)
+        if not self.running_totals:
+            self.credits.append(amount)
+        self.credit_total += amount
+        self.count += 1
 
     @abstractmethod
     def balance(self) -> Amount:
@@ -174,12 +194,15 @@ class TAccount(ABC):
         """
 
     def condense(self):
-        """Create a new account of the same type with only one value as account balance."""
-        return self.empty().topup(self.balance())
+        """Create a new account of the same type with only one value as account balance.
+        Condensed account keeps running totals only."""
+        return self.empty(running_totals=True).topup(self.balance())
 
-    def empty(self):
+    def empty(self, running_totals: bool | None = None):
         """Create a new empty account of the same type."""
-        return self.__class__()
+        if running_totals is None:
+            running_totals = self.running_totals
+        return self.__class__(running_totals=running_totals)
 
     def topup(self, balance):
         """Add starting balance to a proper side of account."""
@@ -193,7 +216,7 @@ class TAccount(ABC):
 
 class DebitAccount(TAccount):
     def balance(self):
-        return sum(self.debits) - sum(self.credits)
+        return self.debit_total - self.credit_total
 
     def transfer_balance(self, my_name: str, dest_name: str) -> "Entry":
         return Entry(debit=dest_name, credit=my_name, amount=self.balance())
@@ -201,7 +224,7 @@ class DebitAccount(TAccount):
 
 class CreditAccount(TAccount):
     def balance(self):
-        return sum(self.credits) - sum(self.debits)
+        return self.credit_total - self.debit_total
 
     def transfer_balance(self, my_name: str, dest_name: str) -> "Entry":
         return Entry(debit=my_name, credit=dest_name, amount=self.balance())
@@ -297,24 +320,75 @@ class Chart:
     liabilities: list[str | Account] = field(default_factory=list)
     income: list[str | Account] = field(default_factory=list)
     expenses: list[str | Account] = field(default_factory=list)
+    # number of decimal places, amounts are integers in minor units
+    scale: int = 0
+    _compiled: "CompiledChart | None" = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_key: tuple | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         self.validate()
 
     def validate(self) -> "Chart":
-        a = list(self.to_dict().keys())
-        b = [x[0] for x in self.dict_items()]
-        if len(a) != len(b):
-            raise AbacusError(
-                [
-                    "Chart should not contain duplicate account names.",
-                    len(a),
-                    len(b),
-                    set(b) - set(a),
-                ]
-            )
+        """Raise error if chart contains duplicate account names."""
+        self._compiled = CompiledChart.new(self)
+        self._compiled_key = self._compiled_key_now()
         return self
 
+    def compiled(self) -> "CompiledChart":
+        """Return chart compiled to account ids.
+
+        Compiled chart is cached and rebuilt if account names, contra accounts
+        or scale change, including changes made in place to account lists.
+        """
+        key = self._compiled_key_now()
+        if self._compiled is None or self._compiled_key != key:
+            self._compiled = CompiledChart.new(self)
+            self._compiled_key = key
+        return self._compiled
+
+    def _compiled_key_now(self) -> tuple:
+        def content(xs):
+            return tuple(
+                x if isinstance(x, str) else (x.name, tuple(x.contra_accounts))
+                for x in xs
+            )
+
+        return (
+            self.income_summary_account,
+            self.retained_earnings_account,
+            self.null_account,
+            self.scale,
+            *[
+                content(xs)
+                for xs in (
+                    self.assets,
+                    self.capital,
+                    self.liabilities,
+                    self.income,
+                    self.expenses,
+                )
+            ],
+        )
+
+    @classmethod
+    def restore(cls, compiled: "CompiledChart", **accounts: list[Account]) -> "Chart":
+        """Create chart with already compiled account ids and skip validation.
+        Used to load chart from cache, `accounts` are account lists by field name."""
+        chart = object.__new__(cls)
+        chart.income_summary_account = compiled.income_summary_account
+        chart.retained_earnings_account = compiled.retained_earnings_account
+        chart.null_account = compiled.null_account
+        chart.scale = compiled.scale
+        for key in ("assets", "capital", "liabilities", "income", "expenses"):
+            setattr(chart, key, accounts.get(key, []))
+        chart._compiled = compiled
+        chart._compiled_key = chart._compiled_key_now()
+        return chart
+
     def to_dict(self) -> dict[str, Holder]:
         """Return a dictionary of account names and account types.
         Will purge duplicate names if found in chart.
@@ -341,8 +415,87 @@ class Chart:
             for contra_name in account.contra_accounts:
                 yield contra_name, Contra(t)
 
-    def ledger(self, starting_balances: dict | None = None):
-        return Ledger.new(self, AccountBalances(starting_balances))
+    def ledger(
+        self, starting_balances: dict | None = None, running_totals: bool = False
+    ):
+        """Create ledger from chart. With `running_totals=True` the ledger
+        accounts keep debit and credit totals, but not individual amounts."""
+        return Ledger.new(self, AccountBalances(starting_balances), running_totals)
+
+
+@dataclass
+class CompiledChart:
+    """Chart of accounts compiled to integer account ids.
+
+    Account id is the position of account name in `names`. For each account id
+    there is a T-account class in `t_accounts` and a side flag in `is_debit`.
+    Contra accounts are mapped to accounts they offset in `contra_parent`.
+    """
+
+    names: list[str]
+    t_accounts: list[type[TAccount]]
+    is_debit: list[bool]
+    contra_parent: dict[str, str]
+    income_summary_account: str
+    retained_earnings_account: str
+    null_account: str
+    scale: int = 0
+    index: dict[str, int] = field(init=False, repr=False)
+    ids_by_type: dict[type[TAccount], list[int]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            duplicates = {n for n, k in Counter(self.names).items() if k > 1}
+            raise AbacusError(
+                ["Chart should not contain duplicate account names.", duplicates]
+            )
+        self.ids_by_type = {}
+        for i, t in enumerate(self.t_accounts):
+            self.ids_by_type.setdefault(t, []).append(i)
+
+    @classmethod
+    def new(cls, chart: "Chart") -> "CompiledChart":
+        names, t_accounts, contra_parent = [], [], {}
+        parent = ""
+        for name, holder in chart.dict_items():
+            # Chart.stream() yields contra accounts right after regular account
+            match holder:
+                case Regular(_):
+                    parent = name
+                case Contra(_):
+                    contra_parent[name] = parent
+            names.append(name)
+            t_accounts.append(holder.t_account)
+        return cls(
+            names=names,
+            t_accounts=t_accounts,  # type: ignore
+            is_debit=[issubclass(t, DebitAccount) for t in t_accounts],
+            contra_parent=contra_parent,
+            income_summary_account=chart.income_summary_account,
+            retained_earnings_account=chart.retained_earnings_account,
+            null_account=chart.null_account,
+            scale=chart.scale,
+        )
+
+    def ids(self, *classes: type[TAccount]) -> list[int]:
+        """Return sorted account ids for given account classes, including subclasses."""
+        return sorted(
+            i
+            for t, ids in self.ids_by_type.items()
+            if issubclass(t, classes)
+            for i in ids
+        )
+
+    def names_of(self, *classes: type[TAccount]) -> list[str]:
+        """Return account names for given account classes in chart order."""
+        return [self.names[i] for i in self.ids(*classes)]
+
+    def contra_pairs(self, contra_t: type[ContraAccount]) -> list[tuple[str, str]]:
+        """Return account and contra account name pairs for a given type of contra account."""
+        return [
+            (self.contra_parent[name], name) for name in self.names_of(contra_t)  # type: ignore
+        ]
 
 
 @dataclass
@@ -368,6 +521,10 @@ class Entry:
     def from_string(cls, line: str):
         return cls(**json.loads(line))
 
+    def names(self) -> list[str]:
+        """Return names of accounts affected by entry."""
+        return [self.debit, self.credit]
+
 
 class AccountBalances(UserDict[str, Amount]):
     def nonzero(self):
@@ -394,33 +551,95 @@ def starting_entries(chart: Chart, balances: AccountBalances):
 
 
 class Ledger(UserDict[str, TAccount]):
+    """Dictionary of account names and T-accounts.
+
+    Ledger keeps account names by T-account class, so that `subset()`
+    does not need to check every account in ledger.
+    """
+
+    # incremented on every change to ledger, used to invalidate cached reports
+    revision: int = 0
+
+    def __init__(self, *args, **kwargs):
+        self._names_by_type: dict[type[TAccount], list[str]] = {}
+        self._positions: dict[str, int] = {}
+        self._counter = 0
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key: str, value: TAccount):
+        if key in self.data:
+            self._names_by_type[type(self.data[key])].remove(key)
+        else:
+            self._positions[key] = self._counter
+            self._counter += 1
+        super().__setitem__(key, value)
+        self._names_by_type.setdefault(type(value), []).append(key)
+        self.revision += 1
+
+    def __delitem__(self, key: str):
+        self._names_by_type[type(self.data[key])].remove(key)
+        del self._positions[key]
+        super().__delitem__(key)
+        self.revision += 1
+
+    def copy(self):
+        return self.__class__(self.data)
+
+    def version(self) -> tuple[int, int]:
+        """Value that changes on every change to ledger, used to invalidate
+        cached reports. Number of postings is included, because T-accounts
+        may be posted to directly, like `ledger["cash"].debit(5)`."""
+        return self.revision, sum(account.count for account in self.data.values())
+
     @classmethod
-    def new(cls, chart: Chart, balances: AccountBalances | None):
+    def new(
+        cls,
+        chart: Chart,
+        balances: AccountBalances | None,
+        running_totals: bool = False,
+    ):
         """Create a new ledger from chart, possibly using starting balances."""
-        ledger = cls({name: h.t_account() for name, h in chart.dict_items()})  # type: ignore
+        compiled = chart.compiled()
+        ledger = cls(
+            {
+                name: t(running_totals=running_totals)
+                for name, t in zip(compiled.names, compiled.t_accounts)
+            }
+        )
         if balances:
-            entries = starting_entries(chart, balances)
-            ledger.post_many(entries)
+            # each starting balance is posted once, without null account
+            ledger.post_many([CompoundEntry.from_balances(chart, balances)])
         return ledger
 
     def post(self, debit: str, credit: str, amount: Amount, title: str = ""):
-        """Post to ledger using debit and credit account names and amount."""
-        # FIXME: title is discarded
+        """Post to ledger using debit and credit account names and amount.
+        Ledger keeps balances only, titles and dates are kept by entries
+        stores, see `abacus.meta`."""
         return self.post_one(Entry(debit, credit, amount))
 
     def post_one(self, entry: Entry):
         """Post one double entry to ledger."""
         return self.post_many(entries=[entry])
 
-    def post_many(self, entries: Iterable[Entry]):
-        """Post several double entries to ledger."""
+    def post_many(self, entries: Iterable["Entry | CompoundEntry"]):
+        """Post several double or compound entries to ledger."""
         failed = []
         for entry in entries:
+            if isinstance(entry, CompoundEntry):
+                if not all(name in self.data for name in entry.names()):
+                    failed.append(entry)
+                    continue
+                for name, amount in entry.debits:
+                    self.data[name].debit(amount=amount)
+                for name, amount in entry.credits:
+                    self.data[name].credit(amount=amount)
+                continue
             try:
                 self.data[entry.debit].debit(amount=entry.amount)
                 self.data[entry.credit].credit(amount=entry.amount)
             except KeyError:
                 failed.append(entry)
+        self.revision += 1
         if failed:
             raise AbacusError(failed)
         return self
@@ -432,14 +651,28 @@ class Ledger(UserDict[str, TAccount]):
             {name: account.balance() for name, account in self.items()}
         )
 
+    def names(self, cls: Type[TAccount]) -> list[str]:
+        """Return names of accounts of type `cls` in ledger order."""
+        groups = [
+            names
+            for t, names in self._names_by_type.items()
+            if issubclass(t, cls) and names
+        ]
+        if len(groups) == 1:
+            return list(groups[0])
+        return sorted(
+            (name for names in groups for name in names),
+            key=self._positions.__getitem__,
+        )
+
     def subset(self, cls: Type[TAccount]):
         """Filter ledger by account type."""
-        return self.__class__(
-            {
-                account_name: t_account
-                for account_name, t_account in self.data.items()
-                if isinstance(t_account, cls)
-            }
+        return self.__class__({name: self.data[name] for name in self.names(cls)})
+
+    def subset_balances(self, cls: Type[TAccount]) -> AccountBalances:
+        """Return balances of accounts of type `cls`."""
+        return AccountBalances(
+            {name: self.data[name].balance() for name in self.names(cls)}
         )
 
     def condense(self):
@@ -450,29 +683,196 @@ class Ledger(UserDict[str, TAccount]):
         )
 
 
+class BalanceVector:
+    """Account balances folded from a stream of entries.
+
+    Keeps one number (debits minus credits) per chart account, so memory use
+    does not depend on the number of entries. Use for large entry stores:
+
+    ```python
+    balances = BalanceVector.new(chart).post_many(store.yield_entries()).balances
+    ```
+    """
+
+    def __init__(self, chart: CompiledChart, net: list[Amount] | None = None):
+        self.chart = chart
+        self.net = [0] * len(chart.names) if net is None else net
+
+    @classmethod
+    def new(cls, chart: Chart) -> "BalanceVector":
+        return cls(chart.compiled())
+
+    def post_one(self, entry: Entry):
+        """Fold one double entry into account balances."""
+        return self.post_many([entry])
+
+    def post_many(self, entries: Iterable["Entry | CompoundEntry"]):
+        """Fold double or compound entries into account balances."""
+        index, net = self.chart.index, self.net
+        failed = []
+        for entry in entries:
+            if isinstance(entry, CompoundEntry):
+                try:
+                    debits = [(index[name], x) for name, x in entry.debits]
+                    credits = [(index[name], x) for name, x in entry.credits]
+                except KeyError:
+                    failed.append(entry)
+                    continue
+                for i, x in debits:
+                    net[i] += x
+                for i, x in credits:
+                    net[i] -= x
+                continue
+            try:
+                d, c = index[entry.debit], index[entry.credit]
+            except KeyError:
+                failed.append(entry)
+                continue
+            net[d] += entry.amount
+            net[c] -= entry.amount
+        if failed:
+            raise AbacusError(failed)
+        return self
+
+    def add_net(self, net: dict[str, Amount]):
+        """Add debits minus credits by account name, for example
+        computed by a database query."""
+        unknown = [name for name in net if name not in self.chart.index]
+        if unknown:
+            raise AbacusError(unknown)
+        for name, x in net.items():
+            self.net[self.chart.index[name]] += x
+        return self
+
+    def balance(self, name: str) -> Amount:
+        """Return balance of account `name`."""
+        i = self.chart.index[name]
+        return self.net[i] if self.chart.is_debit[i] else -self.net[i]
+
+    @property
+    def balances(self) -> AccountBalances:
+        """Return account balances."""
+        return AccountBalances(
+            {
+                name: x if is_debit else -x
+                for name, x, is_debit in zip(
+                    self.chart.names, self.net, self.chart.is_debit
+                )
+            }
+        )
+
+    def ledger(self) -> Ledger:
+        """Return ledger with condensed accounts that hold account balances.
+        Use the ledger to create trial balance, balance sheet, income statement
+        or `Report`."""
+        return Ledger(
+            {
+                name: t(running_totals=True).topup(balance)
+                for (name, balance), t in zip(
+                    self.balances.items(), self.chart.t_accounts
+                )
+            }
+        )
+
+
+class OverlayLedger:
+    """Ledger view that layers postings over a base ledger without copying it.
+
+    Postings are kept as balance changes (deltas) by account name,
+    the base ledger is never modified.
+    """
+
+    def __init__(self, base: Ledger, deltas: dict[str, Amount] | None = None):
+        self.base = base
+        self.deltas: dict[str, Amount] = {} if deltas is None else deltas
+
+    def _add(self, name: str, amount: Amount, is_debit: bool):
+        account = self.base.data[name]
+        if isinstance(account, DebitAccount) != is_debit:
+            amount = -amount
+        self.deltas[name] = self.deltas.get(name, 0) + amount
+
+    def post_one(self, entry: Entry):
+        """Post one double entry to overlay."""
+        return self.post_many([entry])
+
+    def post_many(self, entries: Iterable["Entry | CompoundEntry"]):
+        """Post several double or compound entries to overlay."""
+        failed = []
+        for entry in entries:
+            if isinstance(entry, CompoundEntry):
+                if not all(name in self.base.data for name in entry.names()):
+                    failed.append(entry)
+                    continue
+                for name, amount in entry.debits:
+                    self._add(name, amount, is_debit=True)
+                for name, amount in entry.credits:
+                    self._add(name, amount, is_debit=False)
+            elif entry.debit in self.base.data and entry.credit in self.base.data:
+                self._add(entry.debit, entry.amount, is_debit=True)
+                self._add(entry.credit, entry.amount, is_debit=False)
+            else:
+                failed.append(entry)
+        if failed:
+            raise AbacusError(failed)
+        return self
+
+    def balance(self, name: str) -> Amount:
+        """Return balance of account `name`."""
+        return self.base.data[name].balance() + self.deltas.get(name, 0)
+
+    def transfer_balance(self, my_name: str, dest_name: str) -> Entry:
+        """Create an entry that transfers balance of `my_name` account to `dest_name`."""
+        amount = self.balance(my_name)
+        if isinstance(self.base.data[my_name], DebitAccount):
+            return Entry(debit=dest_name, credit=my_name, amount=amount)
+        return Entry(debit=my_name, credit=dest_name, amount=amount)
+
+    @property
+    def balances(self):
+        """Return account balances."""
+        return AccountBalances({name: self.balance(name) for name in self.base.keys()})
+
+    def subset(self, cls: Type[TAccount]):
+        """Filter overlay by account type."""
+        return self.__class__(self.base.subset(cls), self.deltas)
+
+    def subset_balances(self, cls: Type[TAccount]) -> AccountBalances:
+        """Return balances of accounts of type `cls`."""
+        return AccountBalances(
+            {name: self.balance(name) for name in self.base.names(cls)}
+        )
+
+    def condense(self) -> Ledger:
+        """Return a new ledger with condensed accounts that hold overlay balances."""
+        return Ledger(
+            {
+                name: account.empty(running_totals=True).topup(self.balance(name))
+                for name, account in self.base.items()
+            }
+        )
+
+
 def contra_pairs(chart: Chart, contra_t: Type[ContraAccount]) -> list[tuple[str, str]]:
     """Return list of account and contra account name pairs for a given type of contra account."""
-    attr = {
-        "ContraAsset": "assets",
-        "ContraLiability": "liabilities",
-        "ContraCapital": "capital",
-        "ContraExpense": "expenses",
-        "ContraIncome": "income",
-    }[contra_t.__name__]
-    regular_accounts = chart.pure_accounts(getattr(chart, attr))
-    return [
-        (account.name, contra_name)
-        for account in regular_accounts
-        for contra_name in account.contra_accounts
-    ]
+    return chart.compiled().contra_pairs(contra_t)
 
 
 class Pipeline:
-    """A pipeline to accumulate ledger transformations."""
+    """A pipeline to accumulate ledger transformations.
+
+    Closing entries are posted to an overlay, input ledger is not copied
+    and is not changed.
+    """
 
     def __init__(self, chart: Chart, ledger: Ledger):
+        if not isinstance(ledger, Ledger):
+            # for example, ColumnarLedger
+            ledger = ledger.condense()
         self.chart = chart
-        self.ledger = deepcopy(ledger)
+        # compiled once, closing reads it several times
+        self.compiled = chart.compiled()
+        self.ledger = OverlayLedger(ledger)
         self.closing_entries: list[Entry] = []
 
     def append_and_post(self, entry: Entry):
@@ -481,21 +881,18 @@ class Pipeline:
 
     def close_contra(self, t: Type[ContraAccount]):
         """Close contra accounts of type `t`."""
-        for account, contra_account in contra_pairs(self.chart, t):
-            entry = self.ledger.data[contra_account].transfer_balance(
-                contra_account, account
-            )
+        for account, contra_account in self.compiled.contra_pairs(t):
+            entry = self.ledger.transfer_balance(contra_account, account)
             self.append_and_post(entry)
         return self
 
     def close_to_isa(self):
         """Close income or expense accounts to income summary account."""
-        for name, account in self.ledger.data.items():
-            if isinstance(account, Income) or isinstance(account, Expense):
-                entry = account.transfer_balance(
-                    name, self.chart.income_summary_account
-                )
-                self.append_and_post(entry)
+        for name in self.compiled.names_of(Income, Expense):
+            entry = self.ledger.transfer_balance(
+                name, self.chart.income_summary_account
+            )
+            self.append_and_post(entry)
         return self
 
     def close_isa_to_re(self):
@@ -503,7 +900,7 @@ class Pipeline:
         entry = Entry(
             debit=self.chart.income_summary_account,
             credit=self.chart.retained_earnings_account,
-            amount=self.ledger.data[self.chart.income_summary_account].balance(),
+            amount=self.ledger.balance(self.chart.income_summary_account),
         )
         self.append_and_post(entry)
         return self
@@ -535,11 +932,111 @@ class Pipeline:
         return self
 
 
+class VectorPipeline:
+    """Closing pipeline over a balance vector.
+
+    Produces the same closing entries as `Pipeline`, but each closing stage
+    is computed from account balances in one pass over account ids,
+    entries are not posted to a ledger one by one. Input vector is not changed.
+
+    ```python
+    entries = VectorPipeline(balance_vector).close().closing_entries
+    ```
+    """
+
+    def __init__(self, vector: "BalanceVector"):
+        self.chart = vector.chart
+        self.vector = BalanceVector(vector.chart, list(vector.net))
+        self.closing_entries: list[Entry] = []
+
+    def transfer_balances(self, pairs: list[tuple[int, int]]):
+        """Transfer balance of account `i` to account `j` for each `(i, j)`
+        in `pairs` and add transfer entries to closing entries."""
+        names, net, is_debit = self.chart.names, self.vector.net, self.chart.is_debit
+        self.closing_entries.extend(
+            (
+                Entry(debit=names[j], credit=names[i], amount=net[i])
+                if is_debit[i]
+                else Entry(debit=names[i], credit=names[j], amount=-net[i])
+            )
+            for i, j in pairs
+        )
+        # either way account i ends with zero balance and j gets its net amount
+        for i, j in pairs:
+            net[j] += net[i]
+            net[i] = 0
+        return self
+
+    def close_contra(self, *ts: Type[ContraAccount]):
+        """Close contra accounts of types `ts` to accounts they offset."""
+        index, names = self.chart.index, self.chart.names
+        parent = self.chart.contra_parent
+        pairs = [(i, index[parent[names[i]]]) for t in ts for i in self.chart.ids(t)]
+        return self.transfer_balances(pairs)
+
+    def close_to_isa(self):
+        """Close income or expense accounts to income summary account."""
+        isa = self.chart.index[self.chart.income_summary_account]
+        return self.transfer_balances(
+            [(i, isa) for i in self.chart.ids(Income, Expense)]
+        )
+
+    def close_isa_to_re(self):
+        """Close income summary account to retained earnings account."""
+        index = self.chart.index
+        isa = index[self.chart.income_summary_account]
+        re = index[self.chart.retained_earnings_account]
+        return self.transfer_balances([(isa, re)])
+
+    def close_first(self):
+        """Close contra income and contra expense accounts."""
+        return self.close_contra(ContraIncome, ContraExpense)
+
+    def close_second(self):
+        """Close income and expense accounts to income summary account,
+        then close income summary account to retained earnings."""
+        return self.close_to_isa().close_isa_to_re()
+
+    def close_last(self):
+        """Close permanent contra accounts."""
+        return self.close_contra(ContraAsset, ContraLiability, ContraCapital)
+
+    def close(self):
+        return self.close_first().close_second().close_last()
+
+
+@dataclass
+class ClosingStages:
+    """Condensed ledgers after each stage of closing and closing entries."""
+
+    after_first: Ledger
+    after_second: Ledger
+    after_last: Ledger
+    closing_entries: list[Entry]
+
+    @classmethod
+    def new(cls, chart: Chart, ledger: Ledger) -> "ClosingStages":
+        p = Pipeline(chart, ledger)
+        after_first = p.close_first().ledger.condense()
+        after_second = p.close_second().ledger.condense()
+        after_last = p.close_last().ledger.condense()
+        return cls(after_first, after_second, after_last, p.closing_entries)
+
+
 @dataclass
 class Report:
     chart: Chart
     ledger: Ledger
     rename_dict: dict[str, str] = field(default_factory=dict)
+    # ledger for income statement, if not set income statement is
+    # produced from the first closing stage of `ledger`
+    income_ledger: Ledger | None = None
+    _stages: ClosingStages | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _stages_key: tuple[int, int] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     # FIXME: may condense chart after init
 
@@ -547,27 +1044,66 @@ class Report:
         self.rename_dict[key] = value
         return self
 
+    @classmethod
+    def as_of(cls, chart: Chart, store, date: datetime.date) -> "Report":
+        """Report for entries in `store` dated on or before `date`.
+        Balances are read from day index, see `abacus.asof`."""
+        from abacus.asof import balances_as_of
+
+        all_entries, without_isa = balances_as_of(chart, store, date)
+        return cls(chart, all_entries.ledger(), income_ledger=without_isa.ledger())
+
+    @classmethod
+    def between(
+        cls, chart: Chart, store, start: datetime.date, end: datetime.date
+    ) -> "Report":
+        """Report with balance sheet as of `end` and income statement
+        for entries in `store` dated from `start` to `end`."""
+        from abacus.asof import balances_as_of, balances_between
+
+        all_entries, _ = balances_as_of(chart, store, end)
+        _, without_isa = balances_between(chart, store, start, end)
+        return cls(chart, all_entries.ledger(), income_ledger=without_isa.ledger())
+
     @property
     def pipeline(self):
         return Pipeline(self.chart, self.ledger)
 
+    @property
+    def stages(self) -> ClosingStages:
+        """Closing stages, computed once and recomputed only after ledger changes."""
+        key = (id(self.ledger), self.ledger.version())
+        if self._stages is None or self._stages_key != key:
+            self._stages = ClosingStages.new(self.chart, self.ledger)
+            self._stages_key = key
+        return self._stages
+
+    @property
+    def closing_entries(self) -> list[Entry]:
+        return self.stages.closing_entries
+
+    def scaled(self, statement):
+        """Set chart scale on `statement`, so it is rendered in decimals."""
+        statement.scale = self.chart.scale
+        return statement
+
     @property
     def balance_sheet(self):
-        p = self.pipeline.close_first().close_second().close_last()
-        return BalanceSheet.new(p.ledger)
+        return self.scaled(BalanceSheet.new(self.stages.after_last))
 
     @property
     def balance_sheet_before_closing(self):
-        return BalanceSheet.new(self.ledger)
+        return self.scaled(BalanceSheet.new(self.ledger))
 
     @property
     def income_statement(self):
-        p = self.pipeline.close_first()
-        return IncomeStatement.new(p.ledger)
+        if self.income_ledger is not None:
+            return self.scaled(IncomeStatement.new(self.income_ledger))
+        return self.scaled(IncomeStatement.new(self.stages.after_first))
 
     @property
     def trial_balance(self):
-        return TrialBalance.new(self.ledger)
+        return self.scaled(TrialBalance.new(self.ledger))
 
     @property
     def account_balances(self):
@@ -583,10 +1119,19 @@ class Report:
 
 
 class Statement(ABC):
+    # number of decimal places of amounts, used only for rendering
+    scale: int = 0
+
     @property
     @abstractmethod
     def viewer(self): ...
 
+    def decimals(self):
+        """Return copy of statement with amounts as `Decimal` if scale is set."""
+        from abacus.amounts import to_decimals
+
+        return to_decimals(self, self.scale)
+
     def __str__(self):
         return str(self.viewer)
 
@@ -604,14 +1149,14 @@ class BalanceSheet(Statement):
     def viewer(self):
         from abacus.viewers import BalanceSheetViewer
 
-        return BalanceSheetViewer(self)
+        return BalanceSheetViewer(self.decimals())
 
     @classmethod
     def new(cls, ledger: Ledger):
         return cls(
-            assets=ledger.subset(Asset).balances,
-            capital=ledger.subset(Capital).balances,
-            liabilities=ledger.subset(Liability).balances,
+            assets=ledger.subset_balances(Asset),
+            capital=ledger.subset_balances(Capital),
+            liabilities=ledger.subset_balances(Liability),
         )
 
 
@@ -625,13 +1170,13 @@ class IncomeStatement(Statement):
     def viewer(self):
         from abacus.viewers import IncomeStatementViewer
 
-        return IncomeStatementViewer(self)
+        return IncomeStatementViewer(self.decimals())
 
     @classmethod
     def new(cls, ledger: Ledger):
         return cls(
-            income=ledger.subset(Income).balances,
-            expenses=ledger.subset(Expense).balances,
+            income=ledger.subset_balances(Income),
+            expenses=ledger.subset_balances(Expense),
         )
 
     def current_profit(self):
@@ -644,11 +1189,10 @@ class TrialBalance(UserDict[str, tuple[Amount, Amount]], Statement):
 
     @classmethod
     def new(cls, ledger: Ledger):
-        _ledger = ledger.condense()
         tb = cls()
-        for name, balance in _ledger.subset(DebitAccount).balances.items():
+        for name, balance in ledger.subset_balances(DebitAccount).items():
             tb[name] = (balance, 0)
-        for name, balance in _ledger.subset(CreditAccount).balances.items():
+        for name, balance in ledger.subset_balances(CreditAccount).items():
             tb[name] = (0, balance)
         return cls(tb)
 
@@ -656,7 +1200,7 @@ class TrialBalance(UserDict[str, tuple[Amount, Amount]], Statement):
     def viewer(self):
         from abacus.viewers import TrialBalanceViewer
 
-        return TrialBalanceViewer(self.data)
+        return TrialBalanceViewer(self.decimals().data)
 
 
 def sum_second(xs):
@@ -680,6 +1224,20 @@ class CompoundEntry:
         else:
             raise AbacusError(["Invalid multiple entry", self])
 
+    def names(self) -> list[str]:
+        """Return names of accounts affected by entry."""
+        return [name for name, _ in self.debits + self.credits]
+
+    def to_json(self):
+        return json.dumps({"debits": self.debits, "credits": self.credits})
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CompoundEntry":
+        return cls(
+            debits=[(name, amount) for name, amount in d["debits"]],
+            credits=[(name, amount) for name, amount in d["credits"]],
+        )
+
     def to_entries(self, null_account_name: str) -> list[Entry]:
         """Return list of double entries that make up multiple entry.
         The double entries will correspond to null account.
@@ -696,15 +1254,39 @@ class CompoundEntry:
 
     @classmethod
     def from_balances(cls, chart: Chart, balances: AccountBalances) -> "CompoundEntry":
-        ledger = chart.ledger()
+        compiled = chart.compiled()
 
         def is_debit(name):
-            return isinstance(ledger.data[name], DebitAccount)
-
-        def is_credit(name):
-            return isinstance(ledger.data[name], CreditAccount)
+            return compiled.is_debit[compiled.index[name]]
 
         return cls(
             debits=[(name, b) for name, b in balances.items() if is_debit(name)],
-            credits=[(name, b) for name, b in balances.items() if is_credit(name)],
+            credits=[(name, b) for name, b in balances.items() if not is_debit(name)],
+        )
+
+
+def to_double_entries(
+    entries: Iterable[Entry | CompoundEntry], null_account: str
+) -> list[Entry]:
+    """Split compound entries into double entries with `null_account`."""
+    return [
+        double
+        for entry in entries
+        for double in (
+            entry.to_entries(null_account)
+            if isinstance(entry, CompoundEntry)
+            else [entry]
         )
+    ]
+
+
+def entry_from_dict(d: dict) -> Entry | CompoundEntry:
+    """Create double or compound entry from dictionary."""
+    if "debits" in d:
+        return CompoundEntry.from_dict(d)
+    return Entry(**d)
+
+
+def parse_entry(line: str) -> Entry | CompoundEntry:
+    """Read double or compound entry from JSON string."""
+    return entry_from_dict(json.loads(line))
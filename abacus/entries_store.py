@@ -1,17 +1,83 @@
 """Write and read accounting entries from a file."""
 
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, ClassVar, Iterable
 
-from abacus.core import Chart, Entry
+from abacus.core import Amount, BalanceVector, Chart, CompoundEntry, Entry, parse_entry
 
-__all__ = ["LineJSON"]
+__all__ = ["LineJSON", "Checkpoint"]
+
+# write a new checkpoint after replaying at least this many lines
+CHECKPOINT_EVERY = 10_000
+# bytes read at once when hashing file
+FINGERPRINT_CHUNK = 1 << 20
+
+
+@dataclass
+class Checkpoint:
+    """Condensed balances after first `lines` lines (`offset` bytes) of entries file.
+
+    `digest` is a hash of the first `offset` bytes of file, it is used
+    to detect that the file was rewritten.
+    `nets` hold debits minus credits by account name, one dictionary
+    for each balance vector.
+    """
+
+    offset: int
+    lines: int
+    digest: str
+    nets: list[dict[str, Amount]]
+
+    @classmethod
+    def new(cls, path: Path, offset: int, lines: int, vectors: list[BalanceVector]):
+        digest = fingerprint(path, offset)
+        nets = [
+            {name: x for name, x in zip(v.chart.names, v.net) if x} for v in vectors
+        ]
+        return cls(offset, lines, digest, nets)
+
+    def is_valid(self, path: Path) -> bool:
+        """Return False if file was truncated or rewritten after checkpoint."""
+        if path.stat().st_size < self.offset:
+            return False
+        return fingerprint(path, self.offset) == self.digest
+
+    def restore(self, vectors: list[BalanceVector]) -> bool:
+        """Add checkpoint balances to `vectors`. Return False and do not change
+        `vectors` if some account from checkpoint is not in chart."""
+        if len(vectors) != len(self.nets):
+            return False
+        for vector, net in zip(vectors, self.nets):
+            if any(name not in vector.chart.index for name in net):
+                return False
+        for vector, net in zip(vectors, self.nets):
+            for name, x in net.items():
+                vector.net[vector.chart.index[name]] += x
+        return True
+
+
+def fingerprint(path: Path, offset: int) -> str:
+    """Hash first `offset` bytes of file. Whole prefix is hashed, so that
+    a line changed anywhere before `offset` is detected, hashing is still
+    much faster than parsing the same lines."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while offset > 0:
+            chunk = file.read(min(offset, FINGERPRINT_CHUNK))
+            if not chunk:
+                break
+            digest.update(chunk)
+            offset -= len(chunk)
+    return digest.hexdigest()
 
 
 @dataclass
 class LineJSON:
     path: Path
+    store_format: ClassVar[str] = "linejson"
 
     @classmethod
     def load(cls, path: Path | str | None = None):
@@ -22,18 +88,68 @@ class LineJSON:
     def append(self, entry: Entry) -> None:
         self.append_many([entry])
 
+    def next_id(self) -> int:
+        """Id of next appended entry, its byte offset in file."""
+        return self.path.stat().st_size if self.path.exists() else 0
+
     def _open(self, mode: str):
         return open(self.path, mode, newline="\n", encoding="utf-8")
 
-    def append_many(self, entries: list[Entry]) -> None:
+    def append_many(self, entries: Iterable[Entry | CompoundEntry]) -> int:
+        """Append entries, return id of the first one."""
+        first = self.next_id()
         with self._open("a") as file:
-            for entry in entries:
-                file.write(entry.to_json() + "\n")
+            file.write("".join(entry.to_json() + "\n" for entry in entries))
+        return first
 
-    def yield_entries(self) -> Iterable[Entry]:
+    def yield_entries(self) -> Iterable[Entry | CompoundEntry]:
         with self._open("r") as file:
             for line in file:
-                yield Entry.from_string(line)
+                yield parse_entry(line)
+
+    def yield_entries_from(
+        self, offset: int = 0, end: int | None = None
+    ) -> Iterable[tuple[int, Entry | CompoundEntry]]:
+        """Yield entries starting at byte `offset` (and up to byte `end`)
+        together with byte offset of the end of each entry line."""
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                offset += len(line)
+                yield offset, parse_entry(line.decode("utf-8"))
+                if end is not None and offset >= end:
+                    break
+
+    def yield_entries_with_ids(
+        self, start: int = 0
+    ) -> Iterable[tuple[int, Entry | CompoundEntry]]:
+        """Yield entry ids (byte offsets of lines) and entries
+        starting from id `start`."""
+        for end, entry in self.yield_entries_from(start):
+            yield start, entry
+            start = end
+
+    def entry_at(self, id: int) -> Entry | CompoundEntry:
+        """Read entry with id `id` (byte offset of its line)."""
+        with open(self.path, "rb") as file:
+            file.seek(id)
+            return parse_entry(file.readline().decode("utf-8"))
+
+    def line_ranges(self, start: int, end: int, parts: int) -> list[tuple[int, int]]:
+        """Split bytes from `start` to `end` into at most `parts` ranges
+        of about equal size that begin and end at line boundaries."""
+        bounds = [start]
+        with open(self.path, "rb") as file:
+            for k in range(1, parts):
+                pos = max(start + (end - start) * k // parts, bounds[-1])
+                if pos > 0:
+                    # move to the start of the next line unless already there
+                    file.seek(pos - 1)
+                    file.readline()
+                    pos = min(file.tell(), end)
+                bounds.append(pos)
+        bounds.append(end)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
 
     def yield_entries_for_income_statement(self, chart: Chart) -> Iterable[Entry]:
         """Filter entries that will not close income accounts.
@@ -44,6 +160,62 @@ class LineJSON:
 
         def touches_isa(entry):
             """True if entry touches income summary account."""
-            return (entry.debit == isa) or (entry.credit == isa)
+            return isa in entry.names()
 
         return filterfalse(touches_isa, self.yield_entries())
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".checkpoint")
+
+    def read_checkpoints(self) -> dict[str, Checkpoint]:
+        try:
+            content = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+        try:
+            return {key: Checkpoint(**value) for key, value in content.items()}
+        except TypeError:
+            # checkpoint file written in older format
+            return {}
+
+    def save_checkpoint(self, key: str, checkpoint: Checkpoint) -> None:
+        checkpoints = self.read_checkpoints()
+        checkpoints[key] = checkpoint
+        content = {key: asdict(value) for key, value in checkpoints.items()}
+        self.checkpoint_path.write_text(json.dumps(content), encoding="utf-8")
+
+    def restore_checkpoint(self, key: str, vectors: list[BalanceVector]):
+        """Add balances from checkpoint `key` to `vectors` if the checkpoint
+        is valid. Return byte offset and number of lines to continue from."""
+        checkpoint = self.read_checkpoints().get(key)
+        if (
+            checkpoint
+            and checkpoint.is_valid(self.path)
+            and checkpoint.restore(vectors)
+        ):
+            return checkpoint.offset, checkpoint.lines
+        return 0, 0
+
+    def fold(
+        self,
+        key: str,
+        vectors: list[BalanceVector],
+        post: Callable[[Entry], None],
+        every: int = CHECKPOINT_EVERY,
+    ) -> list[BalanceVector]:
+        """Fold entries into balance `vectors` using `post` function.
+
+        Restores balances from checkpoint `key` if it is valid and replays
+        only the lines appended after the checkpoint. Saves a new checkpoint
+        if at least `every` lines were replayed.
+        """
+        offset, lines = self.restore_checkpoint(key, vectors)
+        replayed = 0
+        for offset, entry in self.yield_entries_from(offset):
+            post(entry)
+            replayed += 1
+        if replayed >= every:
+            lines += replayed
+            self.save_checkpoint(key, Checkpoint.new(self.path, offset, lines, vectors))
+        return vectors
@@ -0,0 +1,291 @@
+"""Transaction metadata kept next to entries store.
+
+Entries hold account names and amounts only, so reports never read
+metadata. Transaction id, posting date and title are written to two
+side files next to the store file:
+
+- `<store>.meta`: fixed-width records of transaction id, date as
+  `YYYYMMDD` integer (0 if not set) and title offset (-1 if not set),
+- `<store>.titles`: title heap, each distinct title is written once
+  as 4-byte length and UTF-8 bytes and referenced by its byte offset,
+- `<store>.titles.index`: hash table of title hashes and heap offsets
+  (see `TitleIndex`), so that a title already in heap is found with
+  a few reads and appending takes the same time however many titles exist.
+
+Transaction id is the position of transaction's first entry in the store,
+see `next_id()` of store classes.
+"""
+
+import datetime
+import hashlib
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from abacus.core import AbacusError
+
+__all__ = ["Meta", "MetaStore", "TitleHeap", "TitleIndex"]
+
+# transaction id, date, title offset
+RECORD = struct.Struct("<qiq")
+LENGTH = struct.Struct("<I")
+NO_TITLE = -1
+# title index header: magic string, number of slots, number of titles, heap size
+INDEX_HEADER = struct.Struct("<8sQQq")
+INDEX_MAGIC = b"ABXTIX01"
+# title hash (0 for empty slot) and title offset in heap
+SLOT = struct.Struct("<Qq")
+INITIAL_SLOTS = 1024
+# heap size in index header while heap and index are being changed
+CHANGING = -1
+
+
+def date_to_int(d: datetime.date | None) -> int:
+    return 0 if d is None else d.year * 10_000 + d.month * 100 + d.day
+
+
+def date_from_int(n: int) -> datetime.date | None:
+    return None if n == 0 else datetime.date(n // 10_000, n // 100 % 100, n % 100)
+
+
+def parse_date(s: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(s)
+    except ValueError:
+        raise AbacusError(f"Date must be YYYY-MM-DD: {s}")
+
+
+@dataclass
+class Meta:
+    id: int
+    date: datetime.date | None = None
+    title: str | None = None
+
+
+def title_hash(b: bytes) -> int:
+    """64-bit hash of encoded title, never 0."""
+    digest = hashlib.blake2b(b, digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1 << 63
+
+
+class TitleIndex:
+    """Open addressing hash table of title hashes and heap offsets in a file.
+
+    Index header keeps heap size the index was built for. If heap size
+    differs (append was interrupted or heap was written without index),
+    the index is rebuilt from heap when opened.
+    """
+
+    def __init__(self, path: Path, heap_path: Path):
+        self.path = path
+        self.heap_path = heap_path
+        self.file = None
+        self.mm: mmap.mmap | None = None
+
+    def __enter__(self) -> "TitleIndex":
+        heap_size = self.heap_path.stat().st_size if self.heap_path.exists() else 0
+        self.file = open(self.path, "r+b" if self.path.exists() else "w+b")
+        header = self.file.read(INDEX_HEADER.size)
+        if len(header) < INDEX_HEADER.size:
+            self.rebuild(heap_size)
+            return self
+        magic, self.slots, self.count, size = INDEX_HEADER.unpack(header)
+        if magic != INDEX_MAGIC or size != heap_size:
+            self.rebuild(heap_size)
+        else:
+            self.mm = mmap.mmap(self.file.fileno(), 0)
+        return self
+
+    def __exit__(self, *args):
+        self.mm.close()
+        self.file.close()
+
+    def _reset(self, slots: int, heap_size: int) -> None:
+        """Make empty table with `slots` slots."""
+        if self.mm is not None:
+            self.mm.close()
+        self.slots, self.count = slots, 0
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(INDEX_HEADER.pack(INDEX_MAGIC, slots, 0, CHANGING))
+        self.file.write(bytes(slots * SLOT.size))
+        self.file.flush()
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        self.set_heap_size(heap_size)
+
+    def rebuild(self, heap_size: int) -> None:
+        """Read all titles from heap into a new table."""
+        data = self.heap_path.read_bytes()[:heap_size] if heap_size else b""
+        found: dict[bytes, int] = {}
+        pos = 0
+        while pos < len(data):
+            (n,) = LENGTH.unpack_from(data, pos)
+            found.setdefault(data[pos + LENGTH.size : pos + LENGTH.size + n], pos)
+            pos += LENGTH.size + n
+        slots = INITIAL_SLOTS
+        while len(found) * 2 > slots:
+            slots *= 2
+        self._reset(slots, CHANGING)
+        for b, offset in found.items():
+            self.insert(title_hash(b), offset)
+        self.set_heap_size(heap_size)
+
+    def set_heap_size(self, heap_size: int) -> None:
+        INDEX_HEADER.pack_into(
+            self.mm, 0, INDEX_MAGIC, self.slots, self.count, heap_size
+        )
+
+    def _slot(self, i: int) -> tuple[int, int]:
+        return SLOT.unpack_from(self.mm, INDEX_HEADER.size + i * SLOT.size)
+
+    def find(self, h: int, is_title) -> int | None:
+        """Return heap offset of title with hash `h`, `is_title(offset)` tells
+        if title at offset is the one looked for (hashes may collide)."""
+        i = h & (self.slots - 1)
+        while True:
+            slot_hash, offset = self._slot(i)
+            if slot_hash == 0:
+                return None
+            if slot_hash == h and is_title(offset):
+                return offset
+            i = (i + 1) & (self.slots - 1)
+
+    def insert(self, h: int, offset: int) -> None:
+        """Add title with hash `h` at heap `offset`, title must not be in table."""
+        if (self.count + 1) * 2 > self.slots:
+            self._grow()
+        i = h & (self.slots - 1)
+        while self._slot(i)[0] != 0:
+            i = (i + 1) & (self.slots - 1)
+        SLOT.pack_into(self.mm, INDEX_HEADER.size + i * SLOT.size, h, offset)
+        self.count += 1
+
+    def _grow(self) -> None:
+        items = [self._slot(i) for i in range(self.slots)]
+        self._reset(self.slots * 2, CHANGING)
+        for h, offset in items:
+            if h:
+                self.insert(h, offset)
+
+
+@dataclass
+class TitleHeap:
+    """Append-only file of distinct titles."""
+
+    path: Path
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".index")
+
+    def intern_many(self, titles: Iterable[str]) -> list[int]:
+        """Return offsets of `titles`, appending titles not yet in file."""
+        titles = list(titles)
+        if not titles:
+            return []
+        offsets: dict[str, int] = {}
+        result: list[int] = []
+        added: list[tuple[int, int]] = []
+        chunks: list[bytes] = []
+        with TitleIndex(self.index_path, self.path) as index:
+            end = self.path.stat().st_size if self.path.exists() else 0
+            with open(self.path, "ab+") as heap:
+
+                def is_title(offset: int, b: bytes) -> bool:
+                    heap.seek(offset)
+                    (n,) = LENGTH.unpack(heap.read(LENGTH.size))
+                    return n == len(b) and heap.read(n) == b
+
+                for title in titles:
+                    if title not in offsets:
+                        b = title.encode("utf-8")
+                        h = title_hash(b)
+                        offset = index.find(h, lambda x: is_title(x, b))
+                        if offset is None:
+                            offset = end
+                            added.append((h, offset))
+                            chunks.append(LENGTH.pack(len(b)) + b)
+                            end += LENGTH.size + len(b)
+                        offsets[title] = offset
+                    result.append(offsets[title])
+                if chunks:
+                    index.set_heap_size(CHANGING)
+                    heap.write(b"".join(chunks))
+            for h, offset in added:
+                index.insert(h, offset)
+            if added:
+                index.set_heap_size(end)
+        return result
+
+    def read_many(self, offsets: Iterable[int]) -> dict[int, str]:
+        """Decode titles at `offsets`."""
+        result: dict[int, str] = {}
+        wanted = set(offsets) - {NO_TITLE}
+        if not wanted:
+            return result
+        with open(self.path, "rb") as file:
+            for offset in wanted:
+                file.seek(offset)
+                (n,) = LENGTH.unpack(file.read(LENGTH.size))
+                result[offset] = file.read(n).decode("utf-8")
+        return result
+
+
+@dataclass
+class MetaStore:
+    """Metadata of transactions in entries store at `path`."""
+
+    path: Path
+
+    @property
+    def meta_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".meta")
+
+    @property
+    def titles(self) -> TitleHeap:
+        return TitleHeap(self.path.with_name(self.path.name + ".titles"))
+
+    def append_many(self, metas: list[Meta]) -> None:
+        heap = self.titles
+        titled = [m.title for m in metas if m.title is not None]
+        offsets = iter(heap.intern_many(titled))
+        records = b"".join(
+            RECORD.pack(
+                m.id,
+                date_to_int(m.date),
+                NO_TITLE if m.title is None else next(offsets),
+            )
+            for m in metas
+        )
+        with open(self.meta_path, "ab") as file:
+            file.write(records)
+
+    def records(self, start: int = 0) -> Iterable[tuple[int, int, int]]:
+        """Yield transaction id, date and title offset without decoding titles,
+        starting at byte `start` of metadata file."""
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, "rb") as file:
+            file.seek(start)
+            data = file.read()
+        yield from RECORD.iter_unpack(data[: len(data) - len(data) % RECORD.size])
+
+    def yield_meta(self) -> Iterable[Meta]:
+        records = list(self.records())
+        titles = self.titles.read_many(t for _, _, t in records)
+        for id, d, t in records:
+            yield Meta(id, date_from_int(d), titles.get(t))
+
+    def get(self, id: int) -> Meta | None:
+        """Return metadata of transaction `id`."""
+        for i, d, t in self.records():
+            if i == id:
+                return Meta(i, date_from_int(d), self.titles.read_many([t]).get(t))
+        return None
+
+    def unlink(self) -> None:
+        self.meta_path.unlink(missing_ok=True)
+        self.titles.path.unlink(missing_ok=True)
+        self.titles.index_path.unlink(missing_ok=True)
@@ -0,0 +1,71 @@
+"""Fold large LineJSON entries file into balances in several processes.
+
+The file is split into byte ranges at line boundaries. Each worker process
+folds its range into partial balance vectors, and the partials are added
+together. Closing entries and reports are computed once from merged balances.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from abacus.core import Amount, BalanceVector, Chart, CompiledChart
+from abacus.entries_store import CHECKPOINT_EVERY, Checkpoint, LineJSON
+
+__all__ = ["fold_report_parallel"]
+
+# smaller ranges are not worth starting a process for
+MIN_RANGE_SIZE = 1 << 20
+
+
+def fold_range(
+    path: Path, start: int, end: int, chart: CompiledChart, exclude: str
+) -> tuple[int, list[Amount], list[Amount]]:
+    """Fold entries between bytes `start` and `end` into balances of all
+    entries and of entries that do not touch `exclude` account.
+    Return number of lines read and the two lists of net balances."""
+    all_entries = BalanceVector(chart)
+    without = BalanceVector(chart)
+    lines = 0
+    for _, entry in LineJSON(path).yield_entries_from(start, end):
+        all_entries.post_one(entry)
+        if exclude not in entry.names():
+            without.post_one(entry)
+        lines += 1
+    return lines, all_entries.net, without.net
+
+
+def fold_report_parallel(
+    chart: Chart,
+    store: LineJSON,
+    jobs: int = 0,
+    every: int = CHECKPOINT_EVERY,
+    min_range_size: int = MIN_RANGE_SIZE,
+) -> tuple[BalanceVector, BalanceVector]:
+    """Same result as `fold_for_report()` computed with up to `jobs` processes,
+    `jobs=0` uses all CPUs. Uses and updates the same checkpoint."""
+    compiled = chart.compiled()
+    isa = chart.income_summary_account
+    key = "report:" + isa
+    vectors = [BalanceVector(compiled), BalanceVector(compiled)]
+    offset, lines = store.restore_checkpoint(key, vectors)
+    end = store.path.stat().st_size
+    parts = min(jobs or os.cpu_count() or 1, (end - offset) // min_range_size + 1)
+    args = [
+        (store.path, a, b, compiled, isa)
+        for a, b in store.line_ranges(offset, end, parts)
+    ]
+    if len(args) > 1:
+        with ProcessPoolExecutor(max_workers=len(args)) as pool:
+            results = list(pool.map(fold_range, *zip(*args)))
+    else:
+        results = [fold_range(*a) for a in args]
+    replayed = 0
+    for n, *nets in results:
+        replayed += n
+        for vector, net in zip(vectors, nets):
+            vector.net = [x + y for x, y in zip(vector.net, net)]
+    if replayed >= every:
+        checkpoint = Checkpoint.new(store.path, end, lines + replayed, vectors)
+        store.save_checkpoint(key, checkpoint)
+    return vectors[0], vectors[1]
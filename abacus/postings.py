@@ -0,0 +1,166 @@
+"""Per-account posting index.
+
+Directory `<store>.postings` next to entries store holds one file per
+account with fixed-width records: entry id and account net balance
+(debits minus credits) after the entry. Posting amount is the difference
+of balances in two consecutive records, so a page of account history with
+running balance is read with one seek, without scanning the store.
+
+`state.json` in the directory keeps account file numbers and store
+position and fingerprint the index is valid for. The index is extended
+with new entries when entries file was only appended to and is rebuilt
+from store otherwise.
+"""
+
+import json
+import shutil
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from abacus.asof import deltas
+from abacus.binary_store import BinaryStore
+from abacus.core import Amount
+from abacus.entries_store import LineJSON, fingerprint
+from abacus.sqlite_store import SQLiteStore
+
+__all__ = ["PostingIndex"]
+
+VERSION = 2
+# entry id, net balance after entry
+RECORD = struct.Struct("<qq")
+# write buffered records to account files after this many entries
+FLUSH_EVERY = 100_000
+
+
+@dataclass
+class PostingIndex:
+    store: LineJSON | BinaryStore | SQLiteStore
+
+    @property
+    def path(self) -> Path:
+        return self.store.path.with_name(self.store.path.name + ".postings")
+
+    def exists(self) -> bool:
+        return (self.path / "state.json").exists()
+
+    def read_state(self) -> dict | None:
+        try:
+            state = json.loads((self.path / "state.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return state if state.get("version") == VERSION else None
+
+    def is_valid(self, state: dict) -> bool:
+        """Return True if store was only appended to since index was saved."""
+        if isinstance(self.store, SQLiteStore):
+            # transactions are never changed, only added with larger numbers
+            return self.store.next_id() >= state["next_id"]
+        size = state["size"]
+        if size == 0:
+            return True
+        path = self.store.path
+        if not path.exists() or path.stat().st_size < size:
+            return False
+        return fingerprint(path, size) == state["fingerprint"]
+
+    def account_path(self, number: int) -> Path:
+        return self.path / f"{number}.bin"
+
+    def update(self, flush_every: int = FLUSH_EVERY) -> "PostingIndex":
+        """Add entries appended to store since last update to the index.
+        Records are written to account files every `flush_every` entries."""
+        state = self.read_state()
+        if state is None or not self.is_valid(state):
+            shutil.rmtree(self.path, ignore_errors=True)
+            state = dict(version=VERSION, accounts={}, sizes={}, next_id=0, size=0)
+        accounts: dict[str, int] = state["accounts"]
+        sizes: dict[str, int] = state["sizes"]
+        start = state["next_id"]
+        self.path.mkdir(exist_ok=True)
+        marker = self.path / "updating"
+        if marker.exists():
+            self.recover(state)
+        nets: dict[str, Amount] = {}
+        records: dict[str, list[bytes]] = {}
+
+        def flush():
+            if records:
+                marker.touch()
+            for name, chunks in records.items():
+                with open(self.account_path(accounts[name]), "ab") as file:
+                    file.write(b"".join(chunks))
+                    sizes[name] = file.tell()
+            records.clear()
+
+        for n, (id, entry) in enumerate(self.store.yield_entries_with_ids(start), 1):
+            changes: dict[str, Amount] = {}
+            for name, x in deltas(entry):
+                changes[name] = changes.get(name, 0) + x
+            for name, x in changes.items():
+                if name not in accounts:
+                    accounts[name] = len(accounts)
+                if name not in nets:
+                    nets[name] = self.last_net(accounts[name])
+                nets[name] += x
+                records.setdefault(name, []).append(RECORD.pack(id, nets[name]))
+            if n % flush_every == 0:
+                flush()
+        flush()
+        state["next_id"] = self.store.next_id()
+        path = self.store.path
+        state["size"] = path.stat().st_size if path.exists() else 0
+        if state["size"]:
+            state["fingerprint"] = fingerprint(path, state["size"])
+        (self.path / "state.json").write_text(json.dumps(state), encoding="utf-8")
+        marker.unlink(missing_ok=True)
+        return self
+
+    def recover(self, state: dict) -> None:
+        """Drop records and account files written by an update that did not
+        finish, keep account files as they are listed in `state`."""
+        names = {number: name for name, number in state["accounts"].items()}
+        for path in self.path.glob("*.bin"):
+            name = names.get(int(path.stem))
+            if name is None:
+                path.unlink()
+            else:
+                with open(path, "r+b") as file:
+                    file.truncate(state["sizes"].get(name, 0))
+
+    def last_net(self, number: int) -> Amount:
+        path = self.account_path(number)
+        if not path.exists() or path.stat().st_size == 0:
+            return 0
+        with open(path, "rb") as file:
+            file.seek(-RECORD.size, 2)
+            return RECORD.unpack(file.read(RECORD.size))[1]
+
+    def count(self, name: str) -> int:
+        """Number of entries that touch account `name`."""
+        number = self.read_state()["accounts"].get(name)
+        if number is None:
+            return 0
+        return self.account_path(number).stat().st_size // RECORD.size
+
+    def postings(
+        self, name: str, start: int = 0, count: int | None = None
+    ) -> list[tuple[int, Amount, Amount]]:
+        """Return entry id, net amount and net balance after the entry
+        for postings to account `name` from `start`-th posting."""
+        number = self.read_state()["accounts"].get(name)
+        if number is None:
+            return []
+        with open(self.account_path(number), "rb") as file:
+            file.seek(max(start - 1, 0) * RECORD.size)
+            n = -1 if count is None else (count + (start > 0)) * RECORD.size
+            records = list(RECORD.iter_unpack(file.read(n)))
+        previous = records.pop(0)[1] if start > 0 and records else 0
+        result = []
+        for id, net in records:
+            result.append((id, net - previous, net))
+            previous = net
+        return result
+
+    def unlink(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
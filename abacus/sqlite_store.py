@@ -0,0 +1,152 @@
+"""Write and read accounting entries from SQLite database.
+
+Each entry is a transaction with postings, two postings (debit and credit)
+for a double entry and one posting per leg for a compound entry.
+Account balances are computed in SQL with `GROUP BY` aggregation,
+entries are not replayed in Python.
+"""
+
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import ClassVar, Iterable
+
+from abacus.core import Amount, CompoundEntry, Entry
+
+__all__ = ["SQLiteStore"]
+
+DEBIT, CREDIT = 1, -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY,
+    txn INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    side INTEGER NOT NULL,
+    amount INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_by_account ON postings(account, side, amount);
+CREATE INDEX IF NOT EXISTS postings_by_txn ON postings(txn);
+"""
+
+
+@dataclass
+class SQLiteStore:
+    path: Path
+    store_format: ClassVar[str] = "sqlite"
+
+    @classmethod
+    def load(cls, path: Path | str | None = None):
+        if path is None:
+            path = Path("./entries.sqlite")
+        return cls(Path(path))
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def append(self, entry: Entry) -> None:
+        self.append_many([entry])
+
+    def next_id(self) -> int:
+        """Id of next appended entry, its transaction number."""
+        with closing(self.connect()) as conn:
+            (last,) = conn.execute(
+                "SELECT COALESCE(MAX(txn), 0) FROM postings"
+            ).fetchone()
+        return last + 1
+
+    def append_many(self, entries: Iterable[Entry | CompoundEntry]) -> int:
+        """Insert entries in one database transaction.
+        Return transaction number of the first entry.
+
+        Write lock is taken before transaction numbers are allocated,
+        so concurrent writers never share a transaction number."""
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (last,) = conn.execute(
+                    "SELECT COALESCE(MAX(txn), 0) FROM postings"
+                ).fetchone()
+
+                def rows():
+                    for txn, entry in enumerate(entries, start=last + 1):
+                        if isinstance(entry, CompoundEntry):
+                            for name, amount in entry.debits:
+                                yield txn, name, DEBIT, amount
+                            for name, amount in entry.credits:
+                                yield txn, name, CREDIT, amount
+                        else:
+                            yield txn, entry.debit, DEBIT, entry.amount
+                            yield txn, entry.credit, CREDIT, entry.amount
+
+                conn.executemany(
+                    "INSERT INTO postings (txn, account, side, amount)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows(),
+                )
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return last + 1
+
+    def yield_entries(self) -> Iterable[Entry | CompoundEntry]:
+        for _, entry in self.yield_entries_with_ids():
+            yield entry
+
+    def yield_entries_with_ids(
+        self, start: int = 0
+    ) -> Iterable[tuple[int, Entry | CompoundEntry]]:
+        """Yield transaction numbers and entries starting from transaction `start`."""
+        with closing(self.connect()) as conn:
+            cursor = conn.execute(
+                "SELECT txn, account, side, amount FROM postings"
+                " WHERE txn >= ? ORDER BY txn, id",
+                (start,),
+            )
+            for txn, rows in groupby(cursor, key=itemgetter(0)):
+                postings = [(name, side, amount) for _, name, side, amount in rows]
+                match postings:
+                    case [(debit, 1, amount), (credit, -1, _)]:
+                        yield txn, Entry(debit, credit, amount)
+                    case _:
+                        yield txn, CompoundEntry(
+                            debits=[(n, x) for n, side, x in postings if side == DEBIT],
+                            credits=[
+                                (n, x) for n, side, x in postings if side == CREDIT
+                            ],
+                        )
+
+    def entry_at(self, id: int) -> Entry | CompoundEntry:
+        """Read entry with id `id` (transaction number)."""
+        for txn, entry in self.yield_entries_with_ids(id):
+            if txn == id:
+                return entry
+            break
+        raise KeyError(id)
+
+    def net_balances(self, exclude: str | None = None) -> dict[str, Amount]:
+        """Return debits minus credits by account name.
+        Skip transactions that touch account `exclude`."""
+        query = "SELECT account, SUM(side * amount) FROM postings"
+        params: tuple = ()
+        if exclude is not None:
+            query += " WHERE txn NOT IN (SELECT txn FROM postings WHERE account = ?)"
+            params = (exclude,)
+        query += " GROUP BY account"
+        with closing(self.connect()) as conn:
+            return dict(conn.execute(query, params).fetchall())
+
+    def fold(self, key: str, vectors: list, post, every: int = 0) -> list:
+        """Fold all entries into balance `vectors` using `post` function.
+        Same interface as `LineJSON.fold()`, prefer `net_balances()`."""
+        for entry in self.yield_entries():
+            post(entry)
+        return vectors
@@ -1 +1,7 @@
-from .app import app  # noqa: F401
+def __getattr__(name):
+    # importing typer app is slow, `bx` entry point in main.py avoids it
+    if name == "app":
+        from .app import app
+
+        return app
+    raise AttributeError(name)
@@ -1,25 +1,33 @@
 """Typer app, including Click subcommand."""
 
 import sys
+from datetime import date
 from pathlib import Path
 from typing import Optional
 
 import typer
 from typing_extensions import Annotated
 
-from abacus.core import BalanceSheet, IncomeStatement, Pipeline, TrialBalance
-from abacus.entries_store import LineJSON
+from abacus.core import (
+    AbacusError,
+    BalanceSheet,
+    BalanceVector,
+    IncomeStatement,
+    TrialBalance,
+    VectorPipeline,
+)
 from abacus.typer_cli.base import (
-    get_chart,
-    get_ledger,
-    get_ledger_income_statement,
+    fold_for_report,
+    get_balances,
+    get_chart_with_titles,
     get_store,
 )
 from abacus.typer_cli.chart import chart
-from abacus.typer_cli.ledger import ledger
+from abacus.typer_cli.daemon import ask_default
+from abacus.typer_cli.ledger import append_entries, ledger
+from abacus.typer_cli.main import assert_balance
 from abacus.typer_cli.post import postx
 from abacus.typer_cli.show import show
-from abacus.user_chart import UserChart
 
 app = typer.Typer(
     add_completion=False, help="A minimal yet valid double entry accounting system."
@@ -49,25 +57,40 @@ def init():
 @app.command(name="assert")
 def assert_(
     name: str,
-    balance: int,
+    balance: str,
     chart_file: Optional[Path] = None,
     ledger_file: Optional[Path] = None,
 ):
     """Verify account balance."""
-    ledger = get_ledger(chart_file, ledger_file)
-    fact = ledger.balances[name]
-    if not fact == balance:
-        sys.exit(f"Account {name} balance is {fact}, expected {balance}.")
+    assert_balance(name, balance, chart_file, ledger_file)
 
 
 @app.command()
 def close():
     """Close accounts at period end."""
-    chart = get_chart()
-    ledger = get_ledger()
-    store = get_store()
-    p = Pipeline(chart, ledger).close()
-    store.append_many(p.closing_entries)
+    p = VectorPipeline(get_balances()).close()
+    try:
+        append_entries(p.closing_entries)
+    except AbacusError as e:
+        sys.exit(str(e))
+
+
+def dated_balances(chart, as_of: str | None, since: str | None):
+    """Return balances for balance sheet as of `as_of` date
+    and for income statement from `since` to `as_of` dates."""
+    from abacus.asof import balances_as_of, balances_between
+    from abacus.meta import parse_date
+
+    try:
+        end = date.max if as_of is None else parse_date(as_of)
+        all_entries, without_isa = balances_as_of(chart, get_store(), end)
+        if since is not None:
+            _, without_isa = balances_between(
+                chart, get_store(), parse_date(since), end
+            )
+    except AbacusError as e:
+        sys.exit(str(e))
+    return all_entries, without_isa
 
 
 @app.command()
@@ -88,15 +111,38 @@ def report(
         bool, typer.Option("--all", help="Show all statements.")
     ] = False,
     json: bool = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", help="Read ledger file in N processes, 0 for all CPUs."
+        ),
+    ] = 1,
+    as_of: Annotated[
+        Optional[str],
+        typer.Option(help="Use entries dated on or before YYYY-MM-DD."),
+    ] = None,
+    since: Annotated[
+        Optional[str],
+        typer.Option(help="Start income statement period on YYYY-MM-DD."),
+    ] = None,
 ):
     """Show reports."""
+    from abacus.amounts import to_decimals
     from abacus.viewers import print_viewers
 
-    ledger = get_ledger().condense()
-    rename_dict = UserChart.load().rename_dict
-    t = TrialBalance.new(ledger)
-    b = BalanceSheet.new(ledger)
-    i = IncomeStatement.new(get_ledger_income_statement().condense())
+    chart, rename_dict = get_chart_with_titles()
+    if as_of is not None or since is not None:
+        all_entries, without_isa = dated_balances(chart, as_of, since)
+    elif (reply := ask_default({"op": "report"})) is not None:
+        compiled = chart.compiled()
+        all_entries = BalanceVector(compiled).add_net(reply["all"])
+        without_isa = BalanceVector(compiled).add_net(reply["without_isa"])
+    else:
+        all_entries, without_isa = fold_for_report(chart, get_store(), jobs)
+    ledger = all_entries.ledger()
+    t = to_decimals(TrialBalance.new(ledger), chart.scale)
+    b = to_decimals(BalanceSheet.new(ledger), chart.scale)
+    i = to_decimals(IncomeStatement.new(without_isa.ledger()), chart.scale)
     if trial_balance and not all_reports:
         t.viewer.print()
     if balance_sheet and not all_reports:
@@ -115,6 +161,37 @@ def report(
         sys.exit("No reports selected. Use -t, -b, -i or --all flags.")
 
 
+@app.command()
+def ingest(
+    file: Path,
+    chart_file: Optional[Path] = None,
+    store_file: Optional[Path] = None,
+):
+    """Post entries from CSV or JSONL file."""
+    from abacus.typer_cli.ingest import ingest as ingest_file
+
+    try:
+        n = ingest_file(file, chart_file, store_file)
+    except (AbacusError, KeyError, ValueError) as e:
+        sys.exit(f"Cannot ingest {file}: {e}")
+    print(f"Posted {n} entries from {file}.")
+
+
+@app.command()
+def serve(chart_file: Optional[Path] = None, store_file: Optional[Path] = None):
+    """Keep chart and balances in memory and answer other commands
+    over a local socket."""
+    from abacus.typer_cli.daemon import SOCKET_PATH, start
+
+    print(f"Listening on {SOCKET_PATH}, stop with Ctrl+C.")
+    try:
+        start(chart_file, store_file)
+    except AbacusError as e:
+        sys.exit(str(e))
+    except KeyboardInterrupt:
+        pass
+
+
 @app.command()
 def unlink(
     yes: Annotated[
@@ -123,8 +200,11 @@ def unlink(
 ):
     """Permanently delete project files in current directory."""
     if yes:
-        UserChart.default()._path.unlink(missing_ok=True)
-        LineJSON.load().path.unlink(missing_ok=True)
+        from abacus.typer_cli.chart import unlink as chart_unlink
+        from abacus.typer_cli.ledger import unlink as ledger_unlink
+
+        chart_unlink(yes)
+        ledger_unlink(yes)
 
 
 combined_typer_click_app = typer.main.get_command(app)
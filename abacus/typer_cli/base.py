@@ -1,31 +1,162 @@
 """Navigation for CLI."""
 
-from abacus.core import Chart, Ledger
+import importlib
+from datetime import date
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Union
+
+from abacus.chart_cache import load_chart, load_chart_with_titles
+from abacus.core import (
+    BalanceVector,
+    Chart,
+    CompoundEntry,
+    Entry,
+    Ledger,
+    to_double_entries,
+)
 from abacus.entries_store import LineJSON
-from abacus.user_chart import UserChart
+
+if TYPE_CHECKING:
+    from abacus.binary_store import BinaryStore
+    from abacus.sqlite_store import SQLiteStore
+
+Store = Union[LineJSON, "BinaryStore", "SQLiteStore"]
+
+
+class StoreFormat(str, Enum):
+    linejson = "linejson"
+    binary = "binary"
+    sqlite = "sqlite"
+
+
+# store classes are imported on first use, so that commands working
+# with one store format do not import modules of other formats
+STORE_CLASSES = {
+    StoreFormat.linejson: "abacus.entries_store:LineJSON",
+    StoreFormat.binary: "abacus.binary_store:BinaryStore",
+    StoreFormat.sqlite: "abacus.sqlite_store:SQLiteStore",
+}
+CHART_PATH = Path("./chart.json")
+SUFFIXES = {".bin": StoreFormat.binary, ".sqlite": StoreFormat.sqlite}
 
 
 def last(label: str) -> str:
     return label.split(":")[-1]
 
 
-def get_store(store_file=None) -> LineJSON:
-    return LineJSON.load(store_file)
+def store_format_of(path: Path | str) -> StoreFormat:
+    """Guess store format from file suffix."""
+    return SUFFIXES.get(Path(path).suffix, StoreFormat.linejson)
+
+
+def store_class(store_format: StoreFormat | str):
+    module, name = STORE_CLASSES[StoreFormat(store_format)].split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def get_store(store_file=None, store_format=None) -> Store:
+    """Return entries store. Without `store_file` use default file name for
+    `store_format`. If format is not given, it is guessed by file suffix or,
+    for default files, by which of the files exist."""
+    if store_file is not None:
+        store_format = store_format or store_format_of(store_file)
+        return store_class(store_format).load(store_file)
+    if store_format is None:
+        store_format = StoreFormat.linejson
+        if not LineJSON.load().path.exists():
+            for f in (StoreFormat.binary, StoreFormat.sqlite):
+                if store_class(f).load().path.exists():
+                    store_format = f
+                    break
+    return store_class(store_format).load()
+
+
+def has_entries(store: Store) -> bool:
+    """Return True if store holds at least one entry."""
+    if not store.path.exists():
+        return False
+    return next(iter(store.yield_entries_with_ids()), None) is not None
+
+
+def storable(store: Store, entries: Iterable[Entry | CompoundEntry], null_account: str):
+    """Return entries that `store` can write. Binary store keeps double
+    entries only, compound entries are split into double entries
+    with null account for it."""
+    if store.store_format == StoreFormat.binary:
+        return to_double_entries(entries, null_account)
+    return entries
+
+
+def append_with_meta(
+    store: Store,
+    entries: Iterable[Entry | CompoundEntry],
+    date: date | None = None,
+    title: str | None = None,
+):
+    """Write entries of one transaction to store and its date and title
+    to metadata files next to store. Update posting index if it is used."""
+    from abacus.meta import Meta, MetaStore
+    from abacus.postings import PostingIndex
+
+    first = store.append_many(entries)
+    if date is not None or title is not None:
+        MetaStore(store.path).append_many([Meta(first, date, title)])
+    index = PostingIndex(store)
+    if index.exists():
+        index.update()
 
 
 def get_chart(chart_file=None) -> Chart:
-    return UserChart.load(chart_file).chart()
+    """Load chart from cache or, if chart file changed, from chart file."""
+    return load_chart(CHART_PATH if chart_file is None else chart_file)
 
 
-def get_ledger(chart_file=None, store_file=None) -> Ledger:
-    chart = get_chart(chart_file)
-    store = get_store(store_file)
-    return chart.ledger().post_many(entries=store.yield_entries())
+def get_chart_with_titles(chart_file=None) -> tuple[Chart, dict[str, str]]:
+    """Same as `get_chart()`, also return account titles for reports."""
+    return load_chart_with_titles(CHART_PATH if chart_file is None else chart_file)
 
 
-def get_ledger_income_statement(chart_file=None, store_file=None) -> Ledger:
+def get_balances(chart_file=None, store_file=None) -> BalanceVector:
+    """Fold all entries from store into account balances in one pass."""
     chart = get_chart(chart_file)
     store = get_store(store_file)
-    ledger = chart.ledger()
-    ledger.post_many(entries=store.yield_entries_for_income_statement(chart))
-    return ledger
+    vector = BalanceVector.new(chart)
+    if store.store_format == StoreFormat.sqlite:
+        return vector.add_net(store.net_balances())
+    store.fold("balances", [vector], vector.post_one)
+    return vector
+
+
+def get_ledger(chart_file=None, store_file=None) -> Ledger:
+    """Return ledger with condensed accounts, CLI commands need only account balances."""
+    return get_balances(chart_file, store_file).ledger()
+
+
+def fold_for_report(
+    chart: Chart, store: Store, jobs: int = 1
+) -> tuple[BalanceVector, BalanceVector]:
+    """Read store once and fold entries into two balance vectors:
+    all entries and entries that do not touch income summary account.
+    The second vector is used to produce income statement.
+    LineJSON file is split between `jobs` processes if `jobs` is not 1."""
+    if jobs != 1 and isinstance(store, LineJSON):
+        from abacus.parallel import fold_report_parallel
+
+        return fold_report_parallel(chart, store, jobs)
+    isa = chart.income_summary_account
+    compiled = chart.compiled()
+    all_entries = BalanceVector(compiled)
+    without_isa = BalanceVector(compiled)
+    if store.store_format == StoreFormat.sqlite:
+        all_entries.add_net(store.net_balances())
+        without_isa.add_net(store.net_balances(exclude=isa))
+        return all_entries, without_isa
+
+    def post(entry):
+        all_entries.post_one(entry)
+        if isa not in entry.names():
+            without_isa.post_one(entry)
+
+    store.fold("report:" + isa, [all_entries, without_isa], post)
+    return all_entries, without_isa
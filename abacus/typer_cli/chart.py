@@ -5,13 +5,16 @@ from typing import List, Optional
 import typer
 from typing_extensions import Annotated
 
+from abacus.chart_cache import cache_path
 from abacus.core import AbacusError
-from abacus.typer_cli.base import UserChart, last
+from abacus.typer_cli.base import CHART_PATH, get_store, has_entries, last
 
 chart = typer.Typer(help="Modify chart of accounts.", add_completion=False)
 
 
 def assure_chart_file_exists(chart_file=None):
+    from abacus.user_chart import UserChart
+
     path = UserChart.default()._path if chart_file is None else chart_file
     if not path.exists():
         sys.exit(
@@ -22,6 +25,8 @@ def assure_chart_file_exists(chart_file=None):
 @chart.command()
 def init():
     """Initialize chart file in current directory."""
+    from abacus.user_chart import UserChart
+
     path = UserChart.default()._path
     if path.exists():
         print(f"Chart file ({path}) already exists.")
@@ -58,6 +63,8 @@ def add(
     chart_file: Optional[Path] = None,
 ):
     """Add accounts to chart."""
+    from abacus.user_chart import UserChart
+
     if len(labels) == 1 and title:
         name(last(labels[0]), title)
     user_chart = UserChart.load(chart_file)
@@ -90,10 +97,23 @@ def set(
     income_summary_account: Optional[str] = None,
     retained_earnings_account: Optional[str] = None,
     null_account: Optional[str] = None,
+    scale: Annotated[
+        Optional[int],
+        typer.Option(help="Number of decimal places in amounts, 2 for cents."),
+    ] = None,
     chart_file: Optional[Path] = None,
+    store_file: Optional[Path] = None,
 ):
-    """Set income summary, retained earnings or null accounts."""
-    if not (income_summary_account or retained_earnings_account or null_account):
+    """Set income summary, retained earnings or null accounts
+    or number of decimal places in amounts."""
+    from abacus.user_chart import UserChart
+
+    if not (
+        income_summary_account
+        or retained_earnings_account
+        or null_account
+        or scale is not None
+    ):
         sys.exit("No changes made.")
     user_chart = UserChart.load(chart_file)
     if income_summary_account:
@@ -105,12 +125,22 @@ def set(
     if null_account:
         user_chart.set_null(null_account)
         print(f"New null account is {null_account}.")
+    if scale is not None:
+        if scale < 0:
+            sys.exit("Scale must be zero or positive.")
+        if scale != user_chart.scale and has_entries(get_store(store_file)):
+            # entries are kept in minor units, new scale would change their amounts
+            sys.exit("Cannot change scale: entries store is not empty.")
+        user_chart.scale = scale
+        print(f"Amounts now have {scale} decimal places.")
     user_chart.save()
 
 
 @chart.command()
 def name(account_name: str, title: str, chart_file: Optional[Path] = None):
     """Set account title."""
+    from abacus.user_chart import UserChart
+
     user_chart = UserChart.load(chart_file)
     user_chart.name(account_name, title).save()
     print(f"New title for {account_name} is {title}.")
@@ -119,6 +149,8 @@ def name(account_name: str, title: str, chart_file: Optional[Path] = None):
 @chart.command()
 def offset(name: str, contra_names: list[str], chart_file: Optional[Path] = None):
     """Add contra accounts."""
+    from abacus.user_chart import UserChart
+
     user_chart = UserChart.load(chart_file)
     for contra_name in contra_names:
         try:
@@ -133,6 +165,8 @@ def offset(name: str, contra_names: list[str], chart_file: Optional[Path] = None
 @chart.command()
 def show(chart_file: Optional[Path] = None):
     """Print chart."""
+    from abacus.user_chart import UserChart
+
     assure_chart_file_exists(chart_file)
     print(UserChart.load(chart_file).json(indent=4, ensure_ascii=False))
 
@@ -144,4 +178,5 @@ def unlink(
     """Permanently delete chart file in current directory."""
 
     if yes:
-        UserChart.default()._path.unlink(missing_ok=True)
+        CHART_PATH.unlink(missing_ok=True)
+        cache_path(CHART_PATH).unlink(missing_ok=True)
@@ -0,0 +1,234 @@
+"""Resident ledger daemon for `bx` commands.
+
+`bx serve` keeps the chart and account balances in memory and answers
+requests over a Unix domain socket (`.bx.sock` in project folder).
+Other `bx` commands send requests to the daemon when it is running
+and read chart and entries files themselves when it is not.
+
+Protocol is one JSON object per line, for example:
+
+```
+> {"op": "balance", "name": "cash"}
+< {"balance": 1000, "scale": 0}
+> {"op": "post", "entries": [{"debit": "cash", "credit": "equity", "amount": 500}]}
+< {"posted": 1}
+```
+
+Before each request the daemon checks chart and store files. New lines
+appended to a LineJSON store are replayed, any other change (chart edited,
+file rewritten, other store format modified) makes the daemon read
+the files again.
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+
+from abacus.chart_cache import load_chart
+from abacus.core import (
+    AbacusError,
+    BalanceVector,
+    CompoundEntry,
+    Entry,
+    entry_from_dict,
+)
+from abacus.entries_store import LineJSON, fingerprint
+from abacus.typer_cli.base import (
+    CHART_PATH,
+    Store,
+    append_with_meta,
+    fold_for_report,
+    get_store,
+    storable,
+)
+
+__all__ = ["Daemon", "ask", "ask_default"]
+
+SOCKET_PATH = Path("./.bx.sock")
+# seconds to wait for daemon, a daemon that does not answer is ignored
+TIMEOUT = 5.0
+
+
+def file_stat(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Daemon:
+    """Chart and balances kept in memory between requests."""
+
+    def __init__(self, chart_path: Path, store: Store):
+        self.chart_path = Path(chart_path)
+        self.store = store
+        self.files = files_of(self.chart_path, store.path)
+        self.stopped = False
+        self.rebuild()
+
+    def rebuild(self):
+        """Read chart and fold all entries from store."""
+        self.chart_stat = file_stat(self.chart_path)
+        chart = load_chart(self.chart_path)
+        self.isa = chart.income_summary_account
+        self.all_entries, self.without_isa = fold_for_report(chart, self.store)
+        self.store_stat = file_stat(self.store.path)
+        self.offset = self.store_stat[1] if self.store_stat else 0
+        self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self):
+        if isinstance(self.store, LineJSON) and self.offset:
+            return fingerprint(self.store.path, self.offset)
+        return None
+
+    def post(self, entry: Entry | CompoundEntry):
+        self.all_entries.post_one(entry)
+        if self.isa not in entry.names():
+            self.without_isa.post_one(entry)
+
+    def sync(self):
+        """Catch up with changes to chart and store files."""
+        if file_stat(self.chart_path) != self.chart_stat:
+            return self.rebuild()
+        store_stat = file_stat(self.store.path)
+        if store_stat == self.store_stat:
+            return
+        if not isinstance(self.store, LineJSON) or store_stat is None:
+            return self.rebuild()
+        if store_stat[1] < self.offset or self._fingerprint() != self.fingerprint:
+            return self.rebuild()
+        for offset, entry in self.store.yield_entries_from(self.offset):
+            self.post(entry)
+            self.offset = offset
+        self.store_stat = store_stat
+        self.fingerprint = self._fingerprint()
+
+    def handle(self, request: dict) -> dict:
+        self.sync()
+        match request.get("op"):
+            case "ping":
+                return self.files
+            case "balance":
+                name = request["name"]
+                if name not in self.all_entries.chart.index:
+                    raise AbacusError(f"Account {name} not in chart.")
+                return {
+                    "balance": self.all_entries.balance(name),
+                    "scale": self.all_entries.chart.scale,
+                }
+            case "balances":
+                return {
+                    "balances": self.all_entries.balances.data,
+                    "scale": self.all_entries.chart.scale,
+                }
+            case "report":
+                return {
+                    "all": nets(self.all_entries),
+                    "without_isa": nets(self.without_isa),
+                }
+            case "post":
+                from abacus.meta import parse_date
+
+                entries = [entry_from_dict(d) for d in request["entries"]]
+                date = parse_date(request["date"]) if "date" in request else None
+                self.append(entries, date, request.get("title"))
+                return {"posted": len(entries)}
+            case "stop":
+                self.stopped = True
+                return {}
+        raise AbacusError(f"Unknown request: {request}")
+
+    def append(self, entries: list[Entry | CompoundEntry], date=None, title=None):
+        """Write entries of one transaction to store after checking account names."""
+        index = self.all_entries.chart.index
+        unknown = {
+            name for entry in entries for name in entry.names() if name not in index
+        }
+        if unknown:
+            raise AbacusError(f"Accounts not in chart: {', '.join(sorted(unknown))}.")
+        chart = self.all_entries.chart
+        entries = storable(self.store, entries, chart.null_account)
+        append_with_meta(self.store, entries, date, title)
+        self.sync()
+
+    def reply(self, line: bytes) -> bytes:
+        try:
+            response = self.handle(json.loads(line))
+        except (AbacusError, KeyError, OSError, TypeError, ValueError) as e:
+            response = {"error": str(e)}
+        return (json.dumps(response) + "\n").encode("utf-8")
+
+    def serve(self, socket_path: Path = SOCKET_PATH):
+        """Answer requests on `socket_path` until stop request is received."""
+        import socketserver
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    self.wfile.write(daemon.reply(line))
+                    if daemon.stopped:
+                        break
+
+        if ask({"op": "ping"}, socket_path) is not None:
+            raise AbacusError(f"Daemon already listens on {socket_path}.")
+        Path(socket_path).unlink(missing_ok=True)
+        with socketserver.UnixStreamServer(str(socket_path), Handler) as server:
+            try:
+                while not self.stopped:
+                    server.handle_request()
+            finally:
+                Path(socket_path).unlink(missing_ok=True)
+
+
+def nets(vector: BalanceVector) -> dict:
+    return {name: x for name, x in zip(vector.chart.names, vector.net) if x}
+
+
+def files_of(chart_path: Path, store_path: Path) -> dict[str, str]:
+    """Absolute chart and store file paths, daemon sends them on ping."""
+    return {
+        "chart": str(Path(chart_path).resolve()),
+        "store": str(store_path.resolve()),
+    }
+
+
+def ask(
+    request: dict, socket_path: Path = SOCKET_PATH, files: dict | None = None
+) -> dict | None:
+    """Send `request` to daemon and return response.
+    Return None if daemon is not running, does not answer in `TIMEOUT`
+    seconds or serves other chart and store files than `files`."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(TIMEOUT)
+            conn.connect(str(socket_path))
+            # close reader too, socket is not closed while reader is open
+            with conn.makefile("rb") as lines:
+                if files is not None:
+                    conn.sendall(b'{"op": "ping"}\n')
+                    if json.loads(lines.readline()) != files:
+                        return None
+                conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+                line = lines.readline()
+    except (ConnectionRefusedError, FileNotFoundError, TimeoutError):
+        return None
+    response = json.loads(line)
+    if "error" in response:
+        raise AbacusError(response["error"])
+    return response
+
+
+def ask_default(request: dict) -> dict | None:
+    """Send `request` to daemon if it serves default chart and store files."""
+    return ask(request, files=files_of(CHART_PATH, get_store().path))
+
+
+def start(chart_file=None, store_file=None, socket_path: Path = SOCKET_PATH):
+    chart_path = CHART_PATH if chart_file is None else chart_file
+    Daemon(chart_path, get_store(store_file)).serve(socket_path)
@@ -0,0 +1,136 @@
+"""Post many entries to ledger from CSV or JSONL file.
+
+JSONL file has one entry per line, either double entry or compound entry:
+
+```
+{"debit": "asset:cash", "credit": "capital:equity", "amount": 1000}
+{"debits": [["asset:ar", 120]], "credits": [["income:sales", 100], ["liability:vat", 20]]}
+```
+
+CSV file has a header with `debit`, `credit` and `amount` columns
+and optional `id` column. A row with both `debit` and `credit` is a double entry.
+A row with only `debit` or only `credit` is a part of compound entry,
+it must have `id`, consecutive rows with the same `id` make one compound entry.
+
+Account names may have prefixes like `asset:cash` to add new accounts to chart.
+"""
+
+import csv
+import json
+from decimal import Decimal
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable
+
+from abacus.amounts import to_minor
+from abacus.core import AbacusError, CompoundEntry, Entry
+from abacus.typer_cli.base import get_store, last, storable
+from abacus.user_chart import UserChart
+
+Record = Entry | CompoundEntry
+
+BATCH_SIZE = 50_000
+
+
+def parse_jsonl(lines: Iterable[str], scale: int = 0) -> Iterable[Record]:
+    for line in lines:
+        if not line.strip():
+            continue
+        d = json.loads(line, parse_float=Decimal)
+        if "debits" in d or "credits" in d:
+            yield CompoundEntry(
+                debits=[(a, to_minor(b, scale)) for a, b in d.get("debits", [])],
+                credits=[(a, to_minor(b, scale)) for a, b in d.get("credits", [])],
+            )
+        else:
+            yield Entry(d["debit"], d["credit"], to_minor(d["amount"], scale))
+
+
+def parse_csv(lines: Iterable[str], scale: int = 0) -> Iterable[Record]:
+    rows = csv.DictReader(lines)
+    for _, group in groupby(rows, key=lambda row: row.get("id") or None):
+        legs = []
+        for row in group:
+            amount = to_minor(row["amount"], scale)
+            if row["debit"] and row["credit"]:
+                yield Entry(row["debit"], row["credit"], amount)
+            elif not row.get("id"):
+                raise AbacusError(f"Compound entry row must have id: {row}")
+            else:
+                legs.append((row["debit"], row["credit"], amount))
+        if legs:
+            yield CompoundEntry(
+                debits=[(dr, amount) for dr, _, amount in legs if dr],
+                credits=[(cr, amount) for _, cr, amount in legs if cr],
+            )
+
+
+def parse_records(lines: Iterable[str], filename: str, scale: int = 0):
+    """Parse CSV or JSONL lines depending on `filename` suffix,
+    amounts are converted to minor units."""
+    if Path(filename).suffix.lower() == ".csv":
+        return parse_csv(lines, scale)
+    return parse_jsonl(lines, scale)
+
+
+def read_records(path: Path, scale: int = 0) -> Iterable[Record]:
+    """Read entries from file, amounts are converted to minor units."""
+    with open(path, encoding="utf-8", newline="") as file:
+        yield from parse_records(file, path.name, scale)
+
+
+def strip_labels(record: Record) -> Record:
+    """Remove prefixes from account names."""
+    match record:
+        case Entry(debit, credit, amount):
+            return Entry(last(debit), last(credit), amount)
+        case CompoundEntry(debits, credits):
+            return CompoundEntry(
+                debits=[(last(name), amount) for name, amount in debits],
+                credits=[(last(name), amount) for name, amount in credits],
+            )
+    raise AbacusError(f"Cannot post {record}")
+
+
+def ingest(path: Path, chart_file=None, store_file=None, batch_size=BATCH_SIZE):
+    """Post all entries from file to ledger, return number of records posted.
+
+    File is read twice: first to check account names and add new accounts
+    to chart (chart file is saved once), then to write entries to store.
+    Nothing is written if some account is unknown or an entry is invalid.
+    """
+    user_chart = UserChart.load(chart_file)
+    known = user_chart.chart().compiled().index
+    new_labels: dict[str, str] = {}
+    unknown = set()
+    scale = user_chart.scale
+    for record in read_records(path, scale):
+        for label in record.names():
+            name = last(label)
+            if name in new_labels and ":" in label and label != new_labels[name]:
+                raise AbacusError(
+                    f"Conflicting labels for {name}: {new_labels[name]}, {label}."
+                )
+            if name in known or name in new_labels:
+                continue
+            if ":" in label:
+                new_labels[name] = label
+            else:
+                unknown.add(name)
+    if unknown:
+        raise AbacusError(f"Accounts not in chart: {', '.join(sorted(unknown))}.")
+    if new_labels:
+        user_chart.use_many(new_labels.values()).save()
+    null_account = user_chart.null_account
+    store = get_store(store_file)
+    n = 0
+    batch: list[Record] = []
+    for record in read_records(path, scale):
+        batch.append(strip_labels(record))
+        n += 1
+        if len(batch) >= batch_size:
+            store.append_many(storable(store, batch, null_account))
+            batch = []
+    if batch:
+        store.append_many(storable(store, batch, null_account))
+    return n
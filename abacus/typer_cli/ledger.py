@@ -1,31 +1,76 @@
+import json
 import sys
+from dataclasses import asdict
+from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
 import typer
 from typing_extensions import Annotated
 
-from abacus.core import AbacusError, AccountBalances, Amount, Entry, starting_entries
-from abacus.entries_store import LineJSON
-from abacus.typer_cli.base import last
-from abacus.user_chart import UserChart
+from abacus.amounts import entry_to_decimals, to_minor
+from abacus.core import (
+    AbacusError,
+    AccountBalances,
+    CompoundEntry,
+    Entry,
+)
+from abacus.typer_cli.base import (
+    StoreFormat,
+    append_with_meta,
+    get_chart,
+    get_store,
+    last,
+    storable,
+)
+from abacus.typer_cli.daemon import ask_default
 
 A = Annotated[list[str], typer.Option()]
 ledger = typer.Typer(help="Modify ledger.", add_completion=False)
 
 
 def assure_ledger_file_exists(store_file):
-    path = LineJSON.load(store_file).path
+    path = get_store(store_file).path
     if not path.exists():
         sys.exit(
             f"Ledger file ({path}) not found. Use `ledger init` command to create it."
         )
 
 
+def append_entries(
+    entries: list[Entry | CompoundEntry],
+    chart_file=None,
+    store_file=None,
+    date: Optional[str] = None,
+    title: Optional[str] = None,
+):
+    """Write entries of one transaction through daemon if it is running,
+    otherwise to store file. `date` is YYYY-MM-DD string."""
+    from abacus.meta import parse_date
+
+    post_date = None if date is None else parse_date(date)
+    if chart_file is None and store_file is None:
+        request: dict = {"op": "post", "entries": [asdict(e) for e in entries]}
+        if date is not None:
+            request["date"] = date
+        if title is not None:
+            request["title"] = title
+        if ask_default(request) is not None:
+            return
+    store = get_store(store_file)
+    if store.store_format == StoreFormat.binary:
+        entries = storable(store, entries, get_chart(chart_file).null_account)
+    append_with_meta(store, entries, post_date, title)
+
+
 @ledger.command()
-def init():
+def init(
+    store_format: Annotated[
+        StoreFormat, typer.Option(help="Ledger file format.")
+    ] = StoreFormat.linejson,
+):
     """Initialize ledger file in current directory."""
-    store_path = LineJSON.load(None).path
+    store_path = get_store(None, store_format).path
     if store_path.exists():
         print(f"Ledger file ({store_path}) already exists.")
     else:
@@ -38,25 +83,38 @@ def load(
     file: Path, chart_file: Optional[Path] = None, store_file: Optional[Path] = None
 ):
     """Load starting balances to ledger from JSON file."""
-    store = LineJSON.load(store_file)
     # FIXME: store must be empty for load() command
-    balances = AccountBalances.load(file)
-    chart = UserChart.load(chart_file).chart()
-    entries = starting_entries(chart, balances)
-    store.append_many(entries)
-    print("Posted starting balances to ledger:", entries)
+    chart = get_chart(chart_file)
+    data = json.loads(Path(file).read_text(encoding="utf-8"), parse_float=Decimal)
+    try:
+        balances = AccountBalances(
+            {name: to_minor(value, chart.scale) for name, value in data.items()}
+        )
+        # one transaction, split into double entries only for binary store
+        entry = CompoundEntry.from_balances(chart, balances)
+        append_entries([entry], chart_file, store_file)
+    except KeyError as e:
+        sys.exit(f"Account {e} not in chart.")
+    except AbacusError as e:
+        sys.exit(str(e))
+    print("Posted starting balances to ledger:", entry)
 
 
 @ledger.command()
 def post(
     debit: str,
     credit: str,
-    amount: Amount,
+    amount: str,
     title: Optional[str] = None,
     chart_file: Optional[Path] = None,
     store_file: Optional[Path] = None,
+    date: Annotated[
+        Optional[str], typer.Option(help="Posting date, YYYY-MM-DD.")
+    ] = None,
 ):
-    """Post double entry."""
+    """Post double entry, amount is a decimal string like `100` or `12.50`."""
+    from abacus.user_chart import UserChart
+
     assure_ledger_file_exists(store_file)
     if ":" in debit:
         try:
@@ -70,17 +128,61 @@ def post(
         except AbacusError:
             pass
         credit = last(credit)
-    LineJSON.load(store_file).append(Entry(debit, credit, amount))
+    try:
+        value = to_minor(amount, get_chart(chart_file).scale)
+        entries = [Entry(debit, credit, value)]
+        append_entries(entries, chart_file, store_file, date, title)
+    except AbacusError as e:
+        sys.exit(str(e))
     print(f"Debited {debit} {amount} and credited {credit} {amount}.")
-    # FIXME: title is discarded
     print("Title:", title)
 
 
 @ledger.command()
-def show(store_file: Optional[Path] = None):
+def show(
+    chart_file: Optional[Path] = None,
+    store_file: Optional[Path] = None,
+    meta: Annotated[
+        bool, typer.Option(help="Show transaction ids, dates and titles.")
+    ] = False,
+):
     """Show ledger."""
+    from abacus.meta import MetaStore
+
     assure_ledger_file_exists(store_file)
-    print(LineJSON.load(store_file).path.read_text())
+    store = get_store(store_file)
+    if meta:
+        for m in MetaStore(store.path).yield_meta():
+            d = None if m.date is None else m.date.isoformat()
+            print(json.dumps(dict(id=m.id, date=d, title=m.title), ensure_ascii=False))
+        return
+    # amounts in decimals, so that output can be read back by `bx ingest`
+    scale = get_chart(chart_file).scale
+    for entry in store.yield_entries():
+        print(json.dumps(entry_to_decimals(entry, scale), default=str))
+
+
+@ledger.command()
+def convert(
+    source: Path,
+    target: Path,
+    store_format: Annotated[
+        Optional[StoreFormat],
+        typer.Option(help="Target file format, guessed from file suffix if not set."),
+    ] = None,
+):
+    """Copy ledger entries to a file of another format."""
+    from abacus.binary_store import convert as convert_store
+
+    if target.exists():
+        sys.exit(f"Target file ({target}) already exists.")
+    target_store = get_store(target, store_format)
+    null_account = None
+    if target_store.store_format == StoreFormat.binary:
+        # binary file keeps double entries only
+        null_account = get_chart().null_account
+    convert_store(get_store(source), target_store, null_account=null_account)
+    print(f"Copied entries from {source} to {target}.")
 
 
 @ledger.command()
@@ -91,4 +193,18 @@ def unlink(
 ):
     """Permanently delete ledger file in current directory."""
     if yes:
-        LineJSON.load().path.unlink(missing_ok=True)
+        from abacus.asof import index_path
+        from abacus.meta import MetaStore
+        from abacus.postings import PostingIndex
+
+        store = get_store()
+        store.path.unlink(missing_ok=True)
+        MetaStore(store.path).unlink()
+        index_path(store).unlink(missing_ok=True)
+        PostingIndex(store).unlink()
+        match store.store_format:
+            case StoreFormat.linejson:
+                store.checkpoint_path.unlink(missing_ok=True)
+            case StoreFormat.sqlite:
+                for suffix in ("-wal", "-shm"):
+                    Path(str(store.path) + suffix).unlink(missing_ok=True)
@@ -0,0 +1,55 @@
+"""Entry point for `bx` command.
+
+Typer loads Click and Rich on import, which takes most of `bx` startup time.
+`bx assert NAME BALANCE`, often called in shell loops, runs here without
+importing them. Other commands are passed to Typer app.
+"""
+
+import sys
+
+
+def assert_balance(name: str, balance: str, chart_file=None, store_file=None):
+    """Exit with error message if account balance is not `balance`.
+    `balance` is a decimal string like `1000` or `12.50`."""
+    from abacus.amounts import to_decimal, to_minor
+    from abacus.core import AbacusError
+    from abacus.typer_cli.daemon import ask_default
+
+    reply = None
+    if chart_file is None and store_file is None:
+        try:
+            reply = ask_default({"op": "balance", "name": name})
+        except AbacusError as e:
+            sys.exit(str(e))
+    if reply is not None:
+        fact, scale = reply["balance"], reply["scale"]
+    else:
+        from abacus.typer_cli.base import get_balances
+
+        vector = get_balances(chart_file, store_file)
+        if name not in vector.chart.index:
+            sys.exit(f"Account {name} not in chart.")
+        fact, scale = vector.balance(name), vector.chart.scale
+    try:
+        expected = to_minor(balance, scale)
+    except AbacusError as e:
+        sys.exit(str(e))
+    if fact != expected:
+        fact = to_decimal(fact, scale)
+        sys.exit(f"Account {name} balance is {fact}, expected {balance}.")
+
+
+def is_number(s: str) -> bool:
+    return s.removeprefix("-").replace(".", "", 1).isdigit()
+
+
+def main(args: list[str] | None = None):
+    args = sys.argv[1:] if args is None else args
+    match args:
+        case ["assert", name, balance] if not name.startswith("-") and is_number(
+            balance
+        ):
+            return assert_balance(name, balance)
+    from abacus.typer_cli.app import combined_typer_click_app
+
+    return combined_typer_click_app(args)
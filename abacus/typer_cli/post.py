@@ -1,43 +1,48 @@
 """Post entries to ledger."""
 
+import sys
 from pathlib import Path
 
 import click
 
+from abacus.amounts import to_minor
 from abacus.core import AbacusError, CompoundEntry
-from abacus.typer_cli.base import get_chart, get_store, last
-from abacus.typer_cli.ledger import load, post
-from abacus.user_chart import UserChart
+from abacus.typer_cli.base import get_chart, last
+from abacus.typer_cli.ledger import append_entries, load, post
 
 
-def post_compound(debits, credits, title, chart_file, store_file):
-    for label, _ in debits + credits:
+def post_compound(debits, credits, title, chart_file, store_file, date=None):
+    from abacus.user_chart import UserChart
+
+    labels = [label for label, _ in debits + credits if ":" in label]
+    if labels:
         user_chart = UserChart.load(chart_file)
-        if ":" in label:
+        for label in labels:
             try:
                 user_chart.use(label)
             except AbacusError:
                 pass
         user_chart.save()
-    debits = [(last(name), value) for name, value in debits]
-    credits = [(last(name), value) for name, value in credits]
+    scale = get_chart(chart_file).scale
+    debits = [(last(name), to_minor(value, scale)) for name, value in debits]
+    credits = [(last(name), to_minor(value, scale)) for name, value in credits]
     compound_entry = CompoundEntry(debits=debits, credits=credits)
-    chart = get_chart(chart_file)
-    entries = compound_entry.to_entries(chart.null_account)
-    store = get_store(store_file)
-    store.append_many(entries)
+    try:
+        append_entries([compound_entry], chart_file, store_file, date, title)
+    except AbacusError as e:
+        sys.exit(str(e))
     print("Posted compound entry:", compound_entry)
     print("Title:", title)
 
 
 @click.command(name="post")
-@click.option("--entry", type=(str, str, int), multiple=True, help="Post double entry,")
+@click.option("--entry", type=(str, str, str), multiple=True, help="Post double entry,")
 @click.option(
-    "--debit", type=(str, int), multiple=True, help="Debit records for compound entry."
+    "--debit", type=(str, str), multiple=True, help="Debit records for compound entry."
 )
 @click.option(
     "--credit",
-    type=(str, int),
+    type=(str, str),
     multiple=True,
     help="Credit records for compound entry.",
 )
@@ -57,8 +62,10 @@ def post_compound(debits, credits, title, chart_file, store_file):
     "--verbose", "-v", is_flag=True, default=False, help="Show more information."
 )
 @click.option("--title", "-t", type=str, help="Set transaction description.")
+@click.option("--date", "-d", type=str, help="Set posting date, YYYY-MM-DD.")
 def postx(
     title,
+    date,
     entry,
     debit,
     credit,
@@ -75,9 +82,9 @@ def postx(
     if entry:
         for item in entry:
             dr, cr, amount = item
-            post(dr, cr, amount, title, chart_file, store_file)
+            post(dr, cr, amount, title, chart_file, store_file, date)
     if debit or credit:
-        post_compound(debit, credit, title, chart_file, store_file)
+        post_compound(debit, credit, title, chart_file, store_file, date)
     if strict:
         print("In strict mode `abacus` will assume:")
         print("- all used account names are already in chart.")
@@ -1,3 +1,4 @@
+import sys
 from json import dumps
 from pathlib import Path
 from typing import Optional
@@ -5,7 +6,10 @@ from typing import Optional
 import typer
 from typing_extensions import Annotated
 
-from abacus.typer_cli.base import get_ledger
+from abacus.amounts import to_decimal
+from abacus.core import AbacusError
+from abacus.typer_cli.base import get_balances, get_chart, get_store
+from abacus.typer_cli.daemon import ask_default
 
 A = Annotated[list[str], typer.Option()]
 
@@ -13,8 +17,39 @@ show = typer.Typer(help="Show chart and account information.", add_completion=Fa
 
 
 @show.command()
-def account(name: str):
-    """Show account information."""
+def account(
+    name: str,
+    page: Annotated[int, typer.Option(help="Page number, -1 for last page.")] = 1,
+    page_size: int = 50,
+    chart_file: Optional[Path] = None,
+    store_file: Optional[Path] = None,
+):
+    """Show account postings with running balance."""
+    from abacus.postings import PostingIndex
+
+    chart = get_chart(chart_file).compiled()
+    if name not in chart.index:
+        sys.exit(f"Account {name} not in chart.")
+    if page == 0 or page < -1:
+        sys.exit("Page must be a positive number or -1 for last page.")
+    if page_size < 1:
+        sys.exit("Page size must be a positive number.")
+    sign = 1 if chart.is_debit[chart.index[name]] else -1
+    store = get_store(store_file)
+    index = PostingIndex(store).update()
+    pages = max(1, -(-index.count(name) // page_size))
+    page = pages if page == -1 else page
+    for id, amount, net in index.postings(name, (page - 1) * page_size, page_size):
+        entry = store.entry_at(id)
+        side = "debit" if amount > 0 else "credit"
+        item = {
+            "id": id,
+            side: to_decimal(abs(amount), chart.scale),
+            "balance": to_decimal(sign * net, chart.scale),
+            "accounts": [n for n in entry.names() if n != name],
+        }
+        print(dumps(item, default=str))
+    print(f"Page {page} of {pages}.", file=sys.stderr)
 
 
 @show.command()
@@ -25,9 +60,18 @@ def balances(
     store_file: Optional[Path] = None,
 ):
     """Show account balances."""
-    ledger = get_ledger(chart_file, store_file)
-    if nonzero:
-        data = ledger.balances.nonzero().data
+    reply = None
+    if chart_file is None and store_file is None:
+        try:
+            reply = ask_default({"op": "balances"})
+        except AbacusError as e:
+            sys.exit(str(e))
+    if reply is not None:
+        data, scale = reply["balances"], reply["scale"]
     else:
-        data = ledger.balances.data
-    print(dumps(data))
+        vector = get_balances(chart_file, store_file)
+        data, scale = vector.balances.data, vector.chart.scale
+    if nonzero:
+        data = {name: balance for name, balance in data.items() if balance}
+    # decimal amounts are shown as strings to keep exact value
+    print(dumps({name: to_decimal(b, scale) for name, b in data.items()}, default=str))
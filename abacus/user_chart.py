@@ -81,7 +81,11 @@ class UserChart(BaseModel):
     null_account: str
     account_labels: dict[str, AccountLabel] = {}
     rename_dict: dict[str, str] = {}
+    # number of decimal places in amounts, 2 for cents
+    scale: int = 0
     _path: Path = PrivateAttr(default=Path("./chart.json"))
+    # all account names, built on first use and updated by methods below
+    _name_set: set[str] | None = PrivateAttr(default=None)
 
     @classmethod
     def default_user_chart(cls):
@@ -97,6 +101,7 @@ class UserChart(BaseModel):
 
     def offset(self, name: str, contra_name: str):
         self.account_labels[self.last(name)].contra_names.append(contra_name)
+        self.name_set.add(contra_name)
         return self
 
     def name(self, name: str, title: str):
@@ -116,19 +121,28 @@ class UserChart(BaseModel):
     def names(self):
         return list(self.yield_names())
 
+    @property
+    def name_set(self) -> set[str]:
+        """Set of all account names in chart, including contra accounts
+        and income summary, retained earnings and null accounts."""
+        if self._name_set is None:
+            self._name_set = set(self.yield_names())
+        return self._name_set
+
     def assert_unique(self, name):
-        if name in self.names:
+        if name in self.name_set:
             raise AbacusError(f"Duplicate account name: {name}")
         return name
 
     def add_one(self, obj: Label | Offset):
         match obj:
             case Label(t, name):
-                if name in self.names:
+                if name in self.name_set:
                     raise AbacusError(f"Name already in chart: {name}")
                 self.account_labels[name] = AccountLabel(t, [])
+                self.name_set.add(name)
             case Offset(name, contra_name):
-                if contra_name in self.names:
+                if contra_name in self.name_set:
                     raise AbacusError(f"Name already in chart: {name}")
                 try:
                     self.account_labels[name].offset(contra_name)
@@ -136,6 +150,7 @@ class UserChart(BaseModel):
                     raise AbacusError(
                         f"Cannot offset {name} because it is not in chart."
                     )
+                self.name_set.add(contra_name)
 
     def use(
         self,
@@ -154,19 +169,74 @@ class UserChart(BaseModel):
                 _ = self.add_one(obj)
         return self
 
+    def use_many(
+        self,
+        label_strings: Iterable[str],
+        prefix: str | None = None,
+        composer: Composer | None = None,
+    ):
+        """Add many accounts at once. Unlike `use()`, all labels are checked
+        before the chart is changed, and the chart is not changed if some name
+        is duplicate or some contra account offsets an unknown account."""
+        if prefix and not prefix.endswith(":"):
+            prefix += ":"
+        prefix = prefix or ""
+        composer = composer or Composer()
+        objs = [
+            obj
+            for label_string in label_strings
+            for obj in extract(prefix + label_string, composer)
+        ]
+        names = self.name_set
+        new_names: set[str] = set()
+        new_labels: set[str] = set()
+        duplicates, missing = [], []
+        for obj in objs:
+            match obj:
+                case Label(_, name):
+                    new_labels.add(name)
+                case Offset(parent, name):
+                    if parent not in self.account_labels and parent not in new_labels:
+                        missing.append(parent)
+            if name in names or name in new_names:
+                duplicates.append(name)
+            new_names.add(name)
+        if duplicates:
+            raise AbacusError(f"Names already in chart: {', '.join(duplicates)}")
+        if missing:
+            raise AbacusError(
+                f"Cannot offset accounts not in chart: {', '.join(missing)}"
+            )
+        for obj in objs:
+            match obj:
+                case Label(t, name):
+                    self.account_labels[name] = AccountLabel(t, [])
+                case Offset(name, contra_name):
+                    self.account_labels[name].offset(contra_name)
+        names.update(new_names)
+        return self
+
     def add_many(self, t: T, names: list[str]):
         for name in names:
             self.add_one(Label(t, name))
 
+    def _rename_special(self, old: str, new: str):
+        if self._name_set is not None:
+            self._name_set.discard(old)
+            self._name_set.add(new)
+
     def set_isa(self, name):
+        self._rename_special(self.income_summary_account, name)
         self.income_summary_account = name  # must check unique except this name itself
 
     def set_re(self, name):
+        self._rename_special(self.retained_earnings_account, name)
         self.retained_earnings_account = (
             name  # must check unique except this name itself
         )
 
     def set_null(self, name):
+        self._rename_special(self.null_account, name)
         self.null_account = name  # must check unique except this name itself
 
     def accounts(self, t: T):
@@ -186,6 +256,7 @@ class UserChart(BaseModel):
             liabilities=self.accounts(T.Liability),  # type: ignore
             income=self.accounts(T.Income),  # type: ignore
             expenses=self.accounts(T.Expense),  # type: ignore
+            scale=self.scale,
         ).validate()
 
     def set_path(self, path: Path | None = None):
@@ -376,8 +376,8 @@ class TrialBalanceViewer(Viewer):
         table.add_column(header=self.headers[0])
         table.add_column(header=self.headers[1], justify="right", style="green")
         table.add_column(header=self.headers[2], justify="right", style="green")
-        for a, b, c in zip(self.account_names, self.debits, self.credits):
-            table.add_row(Text(a), red(Amount(b)), red(Amount(c)))
+        for a, (b, c) in self.statement.items():
+            table.add_row(Text(a), red(b), red(c))
         return table
 
 
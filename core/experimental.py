@@ -3,16 +3,19 @@ from enum import Enum
 
 from pydantic import BaseModel
 
-from abacus.base import Amount
 from abacus.core import (
+    AbacusError,
+    Amount,
     BalanceSheet,
+    BalanceVector,
     Chart,
+    CompiledChart,
     CompoundEntry,
     Entry,
     IncomeStatement,
     Ledger,
-    Pipeline,
     TrialBalance,
+    VectorPipeline,
 )
 from abacus.user_chart import UserChart
 from abacus.viewers import BalanceSheetViewer, IncomeStatementViewer, TrialBalanceViewer
@@ -34,23 +37,42 @@ class Transaction(BaseModel):
 
 @dataclass
 class Book:
+    """Transactions with account balances updated on every posting.
+
+    Balances are kept for each entry type, so reports do not replay
+    transactions: all balances are the sum over types and income statement
+    uses all types except closing entries.
+    """
+
     chart: Chart
     transactions: list[Transaction] = field(default_factory=list)
     rename_dict: dict[str, str] = field(default_factory=dict)
     company: str = ""
+    # positions of transactions in `transactions` by entry type
+    _index: dict[EntryType, list[int]] = field(init=False, repr=False)
+    _vectors: dict[EntryType, BalanceVector] = field(init=False, repr=False)
+    # compiled once, posting looks up account names in it
+    _compiled: CompiledChart = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._compiled = compiled = self.chart.compiled()
+        self._index = {t: [] for t in EntryType}
+        self._vectors = {t: BalanceVector(compiled) for t in EntryType}
+        transactions, self.transactions = self.transactions, []
+        for t in transactions:
+            self._append(t)
 
     @property
     def entries(self) -> list[Entry]:
         return [e for t in self.transactions for e in t.entries]
 
-    @property
-    def _entries_without_closing(self) -> list[Entry]:
-        return [
-            e
-            for t in self.transactions
-            if t.type != EntryType.Closing
-            for e in t.entries
-        ]
+    def transactions_of(self, type_: EntryType) -> list[Transaction]:
+        return [self.transactions[i] for i in self._index[type_]]
+
+    def _vector(self, exclude: tuple[EntryType, ...] = ()) -> BalanceVector:
+        """Return balances summed over entry types except `exclude`."""
+        vectors = [v.net for t, v in self._vectors.items() if t not in exclude]
+        return BalanceVector(self._compiled, [sum(xs) for xs in zip(*vectors)])
 
     def post(self, title, amount, debit, credit):
         entry = Entry(debit, credit, amount)
@@ -64,36 +86,40 @@ class Book:
         """Load starting balances."""
         from abacus.core import starting_entries as f
 
-        entries = f(self.chart.chart(), starting_balances)
-        self._transact(self, "Starting balances", entries, EntryType.Starting)
+        entries = f(self.chart, starting_balances)
+        self._transact("Starting balances", entries, EntryType.Starting)
 
     @property
     def ledger(self) -> Ledger:
-        """Current state of the ledger."""
-        return self.chart.ledger().post_many(self.entries)
-
-    def _pipeline(self, ledger):
-        return Pipeline(self.chart, ledger)
+        """Current state of the ledger, accounts hold balances only."""
+        return self._vector().ledger()
 
     @property
-    def _ledger_for_income_statement(self):
-        proxy_ledger = (
-            self.chart.ledger().post_many(self._entries_without_closing).condense()
-        )
-        p = self._pipeline(proxy_ledger).close_first()
-        return proxy_ledger.post_many(p.closing_entries)
+    def _ledger_for_income_statement(self) -> Ledger:
+        vector = self._vector(exclude=(EntryType.Closing,))
+        return VectorPipeline(vector).close_first().vector.ledger()
 
     def close_period(self):
         """Add closing entries at the end of accounting period."""
-        p = self._pipeline(self.ledger).close()
+        p = VectorPipeline(self._vector()).close()
         self._transact("Closing entries", p.closing_entries, EntryType.Closing)
 
     def _transact(self, title, entries, type_):
-        t = Transaction(title=title, entries=entries, type=type_)
+        self._append(Transaction(title=title, entries=entries, type=type_))
+
+    def _append(self, t: Transaction):
+        """Add transaction and update balances of its entry type.
+        Nothing is changed if some account is not in chart."""
+        index = self._compiled.index
+        unknown = {n for e in t.entries for n in (e.debit, e.credit) if n not in index}
+        if unknown:
+            raise AbacusError(f"Accounts not in chart: {', '.join(sorted(unknown))}.")
+        self._vectors[t.type].post_many(t.entries)
+        self._index[t.type].append(len(self.transactions))
         self.transactions.append(t)
 
     def is_closed(self) -> bool:
-        return len([t for t in self.transactions if t.type == EntryType.Closing]) > 0
+        return len(self._index[EntryType.Closing]) > 0
 
     @property
     def balance_sheet(self) -> BalanceSheetViewer:
@@ -133,34 +159,37 @@ class Book:
         i.print(width)
 
 
-# Register account names
-user_chart = UserChart.default()
-user_chart.use("cash", "ar", "inventory", "prepaid_insurance", prefix="asset")
-user_chart.use("equity", prefix="capital")
-user_chart.use("vat", "ap", prefix="liability")
-user_chart.use("sales", prefix="income")
-user_chart.use("salaries", "rent", "insurance", prefix="expense")
-user_chart.offset("sales", "refunds")
-user_chart.name("vat", "VAT payable")
-user_chart.name("ap", "Other accounts payable")
-user_chart.name("ar", "Accounts receivable")
-
-book = Book(chart=user_chart.chart(), rename_dict=user_chart.rename_dict, company="ABC")
-# Post double entry
-book.post("Shareholder investment", amount=1500, debit="cash", credit="equity")
-# Post compound entry
-book.post_compound(
-    "Invoice with VAT", debits=[("ar", 120)], credits=[("sales", 100), ("vat", 20)]
-)
-
-# Close, print to screen and save
-book.close_period()
-print(book.entries)
-print(book.transactions)
-print(book.chart)
-print(book.trial_balance)
-print(book.balance_sheet)
-print(book.income_statement)
-print(book.account_balances)
-book.print_all()
-# book.save(chart_path="./chart.json", entries_path="./entries.linejson")
+if __name__ == "__main__":
+    # Register account names
+    user_chart = UserChart.default()
+    user_chart.use("cash", "ar", "inventory", "prepaid_insurance", prefix="asset")
+    user_chart.use("equity", prefix="capital")
+    user_chart.use("vat", "ap", prefix="liability")
+    user_chart.use("sales", prefix="income")
+    user_chart.use("salaries", "rent", "insurance", prefix="expense")
+    user_chart.offset("sales", "refunds")
+    user_chart.name("vat", "VAT payable")
+    user_chart.name("ap", "Other accounts payable")
+    user_chart.name("ar", "Accounts receivable")
+
+    book = Book(
+        chart=user_chart.chart(), rename_dict=user_chart.rename_dict, company="ABC"
+    )
+    # Post double entry
+    book.post("Shareholder investment", amount=1500, debit="cash", credit="equity")
+    # Post compound entry
+    book.post_compound(
+        "Invoice with VAT", debits=[("ar", 120)], credits=[("sales", 100), ("vat", 20)]
+    )
+
+    # Close, print to screen and save
+    book.close_period()
+    print(book.entries)
+    print(book.transactions)
+    print(book.chart)
+    print(book.trial_balance)
+    print(book.balance_sheet)
+    print(book.income_statement)
+    print(book.account_balances)
+    book.print_all()
+    # book.save(chart_path="./chart.json", entries_path="./entries.linejson")
@@ -0,0 +1,63 @@
+import pytest
+from experimental import Book, EntryType
+
+from abacus.core import AbacusError, Account, Chart, TrialBalance
+
+
+@pytest.fixture
+def book():
+    chart = Chart(
+        assets=["cash", "ar"],
+        capital=["equity"],
+        liabilities=["vat"],
+        income=[Account("sales", contra_accounts=["refunds"])],
+        expenses=["rent"],
+    )
+    book = Book(chart=chart)
+    book.load({"cash": 10, "equity": 10})
+    book.post("Investment", amount=1500, debit="cash", credit="equity")
+    book.post_compound("Invoice", [("ar", 120)], [("sales", 100), ("vat", 20)])
+    book.post("Refund", amount=10, debit="refunds", credit="cash")
+    book.post("Rent", amount=30, debit="rent", credit="cash")
+    return book
+
+
+def replayed_balances(book):
+    return book.chart.ledger().post_many(book.entries).balances
+
+
+def test_balances_match_replay(book):
+    book.close_period()
+    assert book.account_balances == replayed_balances(book)
+    assert book.account_balances["retained_earnings"] == 60
+
+
+def test_income_statement_ignores_closing_entries(book):
+    before = book.income_statement.statement
+    book.close_period()
+    assert book.is_closed()
+    assert book.income_statement.statement == before
+    assert before.income == {"sales": 90}
+    assert before.expenses == {"rent": 30}
+
+
+def test_index_by_entry_type(book):
+    book.close_period()
+    assert [t.title for t in book.transactions_of(EntryType.Starting)] == [
+        "Starting balances"
+    ]
+    assert len(book.transactions_of(EntryType.Business)) == 4
+    assert len(book.transactions_of(EntryType.Closing)) == 1
+
+
+def test_restore_from_transactions(book):
+    copy = Book(chart=book.chart, transactions=book.transactions)
+    assert TrialBalance.new(copy.ledger) == TrialBalance.new(book.ledger)
+
+
+def test_unknown_account_changes_nothing(book):
+    n = len(book.transactions)
+    with pytest.raises(AbacusError):
+        book.post("Wrong", amount=1, debit="cash", credit="xxx")
+    assert len(book.transactions) == n
+    assert book.account_balances == replayed_balances(book)
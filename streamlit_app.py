@@ -3,13 +3,62 @@
 # pip install -e .
 # streamlit run streamlit_app.py
 
+import io
+
 import streamlit as st
 
-from abacus import Chart, Report
-from abacus.core import Entry
+from abacus import Chart
+from abacus.core import (
+    AbacusError,
+    BalanceSheet,
+    BalanceVector,
+    Entry,
+    IncomeStatement,
+    TrialBalance,
+    VectorPipeline,
+)
+from abacus.typer_cli.ingest import parse_records, strip_labels
+
+
+@st.cache_resource
+def get_chart() -> Chart:
+    """Chart is created and compiled once, not on every rerun."""
+    chart = Chart(
+        assets=["cash", "ar", "inventory"],
+        capital=["equity"],
+        income=["sales"],
+        expenses=["cogs", "sga"],
+    )
+    chart.compiled()
+    return chart
+
+
+chart = get_chart()
+rename_dict = dict(
+    ar="Accounts receivable",
+    cogs="Cost of sales",
+    sga="Selling, general and adm.expenses",
+)
+
+# account balances are updated with each posted entry, entries are not kept
+if "balances" not in st.session_state:
+    st.session_state["balances"] = BalanceVector.new(chart)
+    st.session_state["posted"] = 0
+    # rendered reports by name, cleared after posting
+    st.session_state["reports"] = {}
 
-if "entries" not in st.session_state:
-    st.session_state["entries"] = []
+
+def post(entries):
+    """Add entries to balances. Nothing is posted if some account is not in chart."""
+    entries = [strip_labels(entry) for entry in entries]
+    # chart compiled once for the balances vector
+    index = st.session_state["balances"].chart.index
+    unknown = {name for e in entries for name in e.names() if name not in index}
+    if unknown:
+        raise AbacusError(f"Accounts not in chart: {', '.join(sorted(unknown))}.")
+    st.session_state["balances"].post_many(entries)
+    st.session_state["posted"] += len(entries)
+    st.session_state["reports"] = {}
 
 
 def as_integer(a: str):
@@ -29,53 +78,62 @@ with st.sidebar:
         submit = st.form_submit_button(label="Post entry")
         if submit:
             st.caption(f"Last posted: {dr}, {cr}, {a}")
+    st.header("Upload entries")
+    with st.form("upload_entries", clear_on_submit=True):
+        uploaded = st.file_uploader("CSV or JSONL file", type=["csv", "jsonl"])
+        upload = st.form_submit_button(label="Post entries from file")
 
 if submit:
     if v := as_integer(a):
-        st.session_state["entries"] += [Entry(dr, cr, v)]
+        post([Entry(dr, cr, v)])
     else:
         st.warning(f"Cannot process value: {a}")
 
+if upload and uploaded is not None:
+    lines = io.TextIOWrapper(uploaded, encoding="utf-8")
+    try:
+        post(list(parse_records(lines, uploaded.name)))
+    except (AbacusError, KeyError, ValueError) as e:
+        st.warning(f"Cannot post entries from {uploaded.name}: {e}")
+
 st.header("Accounting with `abacus` :star:")
 
 """Use sidebar to post double entries and see how they affect financial reports."""
 
 
-chart = Chart(
-    assets=["cash", "ar", "inventory"],
-    capital=["equity"],
-    income=["sales"],
-    expenses=["cogs", "sga"],
-)
-rename_dict = dict(
-    ar="Accounts receivable",
-    cogs="Cost of sales",
-    sga="Selling, general and adm.expenses",
-)
+def balance_sheet(vector: BalanceVector):
+    ledger = VectorPipeline(vector).close().vector.ledger()
+    return BalanceSheet.new(ledger).viewer.use(rename_dict)
 
 
-def live_reports():
-    ledger = chart.ledger().post_many(st.session_state["entries"])
-    report = Report(chart, ledger.condense())
-    return (
-        report.balance_sheet.viewer.use(rename_dict),
-        report.income_statement.viewer.use(rename_dict),
-        report.trial_balance,
-    )
+def income_statement(vector: BalanceVector):
+    ledger = VectorPipeline(vector).close_first().vector.ledger()
+    return IncomeStatement.new(ledger).viewer.use(rename_dict)
+
+
+def trial_balance(vector: BalanceVector):
+    return TrialBalance.new(vector.ledger()).viewer
 
 
-tab1, tab2, tab3 = st.tabs(["Balance sheet", "Income statement", "Trial balance"])
+REPORTS = {
+    "Balance sheet": balance_sheet,
+    "Income statement": income_statement,
+    "Trial balance": trial_balance,
+}
 
-b, i, t = live_reports()
 
-with tab1:
-    st.text(b)
+def report(name: str) -> str:
+    """Render report `name` once after each posting."""
+    reports = st.session_state["reports"]
+    if name not in reports:
+        reports[name] = str(REPORTS[name](st.session_state["balances"]))
+    return reports[name]
 
-with tab2:
-    st.text(i)
 
-with tab3:
-    st.text(t)
+# only the selected report is computed, tabs would render all three
+name = st.radio("Report:", list(REPORTS), horizontal=True)
+st.text(report(name))
+st.caption(f"Entries posted: {st.session_state['posted']}")
 
 st.caption(
     """
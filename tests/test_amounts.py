@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import pytest
+
+from abacus.amounts import to_decimal, to_decimals, to_minor
+from abacus.core import AbacusError, BalanceSheet, TrialBalance
+
+
+@pytest.mark.parametrize(
+    "value, scale, minor",
+    [
+        ("100", 0, 100),
+        ("12.50", 2, 1250),
+        ("-0.01", 2, -1),
+        (Decimal("1.1"), 2, 110),
+        (7, 2, 700),
+        ("1E+2", 0, 100),
+    ],
+)
+def test_to_minor(value, scale, minor):
+    assert to_minor(value, scale) == minor
+
+
+@pytest.mark.parametrize("value", ["0.001", 1.5, "NaN", "Infinity", "ten"])
+def test_to_minor_rejects(value):
+    with pytest.raises(AbacusError):
+        to_minor(value, 2)
+
+
+def test_to_decimal_round_trip():
+    assert to_decimal(1250, 2) == Decimal("12.50")
+    assert str(to_decimal(1250, 2)) == "12.50"
+    assert to_minor(str(to_decimal(-1, 2)), 2) == -1
+    assert to_decimal(1250, 0) == 1250
+
+
+def test_to_decimals_keeps_statement_type():
+    tb = to_decimals(TrialBalance({"cash": (1050, 0)}), 2)
+    assert tb == TrialBalance({"cash": (Decimal("10.50"), Decimal("0.00"))})
+    bs = BalanceSheet(assets={"cash": 1050}, capital={"equity": 1050}, liabilities={})
+    assert to_decimals(bs, 2).assets["cash"] == Decimal("10.50")
+
+
+def test_report_renders_amounts_with_chart_scale():
+    from abacus.core import Chart, Report
+
+    chart = Chart(assets=["cash"], capital=["equity"], scale=2)
+    ledger = chart.ledger()
+    ledger.post("cash", "equity", 12345)
+    report = Report(chart, ledger)
+    assert report.balance_sheet.assets == {"cash": 12345}
+    assert "123.45" in str(report.balance_sheet)
+    assert "123.45" in str(report.trial_balance)
@@ -0,0 +1,126 @@
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from abacus.asof import balances_as_of, balances_between, index_path, read_index
+from abacus.binary_store import BinaryStore
+from abacus.core import BalanceVector, Chart, Entry
+from abacus.entries_store import LineJSON
+from abacus.sqlite_store import SQLiteStore
+from abacus.typer_cli.base import append_with_meta
+
+START = date(2024, 1, 1)
+
+
+@pytest.fixture
+def chart():
+    return Chart(assets=["cash", "ar"], capital=["equity"], income=["sales"])
+
+
+def post_random(store, n, seed):
+    """Post entries with random dates, some without date.
+    Return list of (date, entry) as used for as-of balances."""
+    rng = random.Random(seed)
+    posted = []
+    last = None
+    for _ in range(n):
+        entry = rng.choice(
+            [
+                Entry("cash", "equity", 10),
+                Entry("ar", "sales", 3),
+                Entry("cash", "ar", 1),
+            ]
+        )
+        d = None if rng.random() < 0.3 else START + timedelta(days=rng.randrange(90))
+        append_with_meta(store, [entry], d)
+        last = d or last
+        posted.append((last, entry))
+    return posted
+
+
+def replay(chart, posted, end):
+    vector = BalanceVector.new(chart)
+    return vector.post_many(e for d, e in posted if d is None or d <= end).net
+
+
+@pytest.mark.parametrize(
+    "store_class, name",
+    [(LineJSON, "e.linejson"), (BinaryStore, "e.bin"), (SQLiteStore, "e.sqlite")],
+)
+def test_as_of_matches_replay(tmp_path, chart, store_class, name):
+    store = store_class(Path(tmp_path) / name)
+    posted = post_random(store, 200, seed=1)
+    for k in range(0, 100, 7):
+        end = START + timedelta(days=k)
+        all_entries, _ = balances_as_of(chart, store, end)
+        assert all_entries.net == replay(chart, posted, end)
+    # appended entries extend saved index
+    posted += post_random(store, 50, seed=2)
+    end = START + timedelta(days=45)
+    assert balances_as_of(chart, store, end)[0].net == replay(chart, posted, end)
+    assert read_index(store).next_id == store.next_id()
+
+
+def test_between_dates(tmp_path, chart):
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    append_with_meta(store, [Entry("ar", "sales", 5)], date(2024, 1, 31))
+    append_with_meta(store, [Entry("ar", "sales", 7)], date(2024, 2, 1))
+    append_with_meta(store, [Entry("ar", "sales", 9)], date(2024, 3, 1))
+    _, feb = balances_between(chart, store, date(2024, 2, 1), date(2024, 2, 29))
+    assert feb.balances["sales"] == 7
+
+
+def test_rewritten_store_rebuilds_index(tmp_path, chart):
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    append_with_meta(store, [Entry("cash", "equity", 5)], date(2024, 1, 1))
+    assert balances_as_of(chart, store, date(2024, 1, 1))[0].balance("cash") == 5
+    store.path.write_text("")
+    store.append(Entry("cash", "equity", 20))
+    assert balances_as_of(chart, store, date(2024, 1, 1))[0].balance("cash") == 20
+    assert index_path(store).exists()
+
+
+def test_report_as_of_and_between(tmp_path, chart):
+    from abacus.core import Report
+
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    append_with_meta(store, [Entry("cash", "equity", 100)], date(2024, 1, 1))
+    append_with_meta(store, [Entry("ar", "sales", 5)], date(2024, 1, 31))
+    append_with_meta(store, [Entry("ar", "sales", 7)], date(2024, 2, 1))
+    report = Report.as_of(chart, store, date(2024, 1, 31))
+    assert report.balance_sheet.assets == {"cash": 100, "ar": 5}
+    assert report.income_statement.income == {"sales": 5}
+    report = Report.between(chart, store, date(2024, 2, 1), date(2024, 2, 29))
+    assert report.balance_sheet.assets == {"cash": 100, "ar": 12}
+    assert report.income_statement.income == {"sales": 7}
+
+
+def test_index_reads_only_new_metadata(tmp_path, chart, monkeypatch):
+    from abacus.meta import MetaStore
+
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    append_with_meta(store, [Entry("cash", "equity", 5)], date(2024, 1, 1))
+    balances_as_of(chart, store, date(2024, 1, 1))
+    meta_path = MetaStore(store.path).meta_path
+    size = meta_path.stat().st_size
+    assert read_index(store).meta_size == size
+    starts = []
+    records = MetaStore.records
+
+    def spy(self, start=0):
+        starts.append(start)
+        return records(self, start)
+
+    monkeypatch.setattr(MetaStore, "records", spy)
+    append_with_meta(store, [Entry("ar", "sales", 3)], date(2024, 3, 2))
+    append_with_meta(store, [Entry("cash", "ar", 1)], date(2024, 2, 1))
+    assert balances_as_of(chart, store, date(2024, 2, 1))[0].balance("ar") == -1
+    assert balances_as_of(chart, store, date(2024, 3, 1))[0].balance("ar") == -1
+    assert balances_as_of(chart, store, date(2024, 3, 2))[0].balance("ar") == 2
+    assert starts[0] == size
+    assert read_index(store).meta_size == meta_path.stat().st_size
+    index = read_index(store)
+    assert index.months == [202401, 202402, 202403]
+    assert index.changes[0][-1] == {"ar": 3, "sales": -3}
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from abacus.binary_store import INITIAL_CAPACITY, BinaryStore, convert
+from abacus.core import AbacusError, Chart, CompoundEntry, Entry
+from abacus.entries_store import LineJSON
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BinaryStore(Path(tmp_path) / "entries.bin")
+
+
+@pytest.fixture
+def entries():
+    return [Entry("cash", "equity", 499), Entry("cash", "equity", 501)]
+
+
+def test_yield_entries(store, entries):
+    store.append_many(entries)
+    store.append(Entry("ar", "sales", 10))
+    assert list(store.yield_entries()) == entries + [Entry("ar", "sales", 10)]
+    assert store.names == ["cash", "equity", "ar", "sales"]
+    assert len(store) == 3
+
+
+def test_empty_file_yields_nothing(store):
+    store.path.touch()
+    assert list(store.yield_entries()) == []
+
+
+def test_header_grows_with_many_account_names(store):
+    entries = [Entry(f"account_{i}", "equity", i) for i in range(500)]
+    store.append(Entry("cash", "equity", 1))
+    store.append_many(entries)
+    assert store.header().capacity > INITIAL_CAPACITY
+    assert list(store.yield_entries()) == [Entry("cash", "equity", 1)] + entries
+
+
+def test_failed_header_rewrite_keeps_file(store, monkeypatch):
+    store.append(Entry("cash", "equity", 1))
+
+    def fail(source, target):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("abacus.binary_store.shutil.copyfileobj", fail)
+    with pytest.raises(OSError):
+        store.append_many([Entry(f"account_{i}", "equity", i) for i in range(500)])
+    assert list(store.yield_entries()) == [Entry("cash", "equity", 1)]
+
+
+def test_not_a_binary_file_raises(store):
+    store.path.write_bytes(b"x" * 100)
+    with pytest.raises(AbacusError):
+        store.names
+
+
+def test_compound_entry_raises(store):
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 12)])
+    with pytest.raises(AbacusError):
+        store.append_many([entry])
+
+
+def test_convert_to_linejson_and_back(tmp_path, store, entries):
+    store.append_many(entries)
+    linejson = LineJSON(Path(tmp_path) / "entries.linejson")
+    convert(store, linejson)
+    store_2 = BinaryStore(Path(tmp_path) / "entries_2.bin")
+    convert(linejson, store_2)
+    assert list(store_2.yield_entries()) == entries
+
+
+def test_post_to_columnar_ledger(store, entries):
+    pytest.importorskip("numpy")
+    from abacus.columnar import ColumnarLedger
+
+    chart = Chart(assets=["cash"], capital=["equity"])
+    store.append_many(entries)
+    ledger = store.post_to(ColumnarLedger.new(chart))
+    assert ledger.balances.nonzero() == {"cash": 1000, "equity": 1000}
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from abacus.chart_cache import cache_path, load_chart, load_chart_with_titles
+from abacus.user_chart import UserChart
+
+
+@pytest.fixture
+def chart_path(tmp_path):
+    path = Path(tmp_path) / "chart.json"
+    UserChart.default().set_path(path).use(
+        "asset:cash", "capital:equity", "contra:equity:ts", "income:sales"
+    ).save()
+    return path
+
+
+def test_cache_hit_restores_same_chart(chart_path, monkeypatch):
+    chart = load_chart(chart_path)
+    assert cache_path(chart_path).exists()
+
+    def fail(*args):
+        raise AssertionError("chart file parsed again")
+
+    monkeypatch.setattr(UserChart, "load", fail)
+    restored = load_chart(chart_path)
+    assert restored == chart
+    assert restored.compiled() == chart.compiled()
+    assert restored.compiled().contra_parent == {"ts": "equity"}
+
+
+def test_changed_chart_file_is_parsed_again(chart_path):
+    load_chart(chart_path)
+    UserChart.load(chart_path).use("expense:rent").save()
+    assert "rent" in load_chart(chart_path).compiled().index
+
+
+def test_broken_cache_is_ignored(chart_path):
+    chart = load_chart(chart_path)
+    cache_path(chart_path).write_bytes(b"not a cache")
+    assert load_chart(chart_path) == chart
+
+
+def test_cache_keeps_scale(chart_path):
+    user_chart = UserChart.load(chart_path)
+    user_chart.scale = 2
+    user_chart.save()
+    assert load_chart(chart_path).scale == 2
+    assert load_chart(chart_path).compiled().scale == 2
+
+
+def test_cache_keeps_account_titles(chart_path, monkeypatch):
+    UserChart.load(chart_path).name("sales", "Revenue").save()
+    load_chart_with_titles(chart_path)
+    monkeypatch.setattr(UserChart, "load", None)
+    chart, titles = load_chart_with_titles(chart_path)
+    assert titles == {"sales": "Revenue"}
+    assert "sales" in chart.compiled().index
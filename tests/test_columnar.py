@@ -0,0 +1,81 @@
+import pytest
+
+from abacus.core import (
+    AbacusError,
+    Account,
+    Chart,
+    CompoundEntry,
+    Entry,
+    Report,
+    TrialBalance,
+)
+
+pytest.importorskip("numpy")
+ColumnarLedger = pytest.importorskip("abacus.columnar").ColumnarLedger
+
+
+@pytest.fixture
+def chart():
+    return Chart(
+        assets=["cash"],
+        capital=[Account("equity", contra_accounts=["ts"])],
+        income=[Account("sales", contra_accounts=["refunds"])],
+        expenses=["salaries"],
+    )
+
+
+@pytest.fixture
+def entries():
+    return [
+        Entry("cash", "equity", 120),
+        Entry("ts", "cash", 20),
+        Entry("cash", "sales", 47),
+        Entry("refunds", "cash", 5),
+        Entry("salaries", "cash", 30),
+    ]
+
+
+@pytest.mark.unit
+def test_post_arrays(chart):
+    ledger = ColumnarLedger.new(chart)
+    cash, equity = ledger.ids(["cash", "equity"]).tolist()
+    ledger.post_arrays([cash, cash], [equity, equity], [100, 50])
+    assert ledger.balances.nonzero() == {"cash": 150, "equity": 150}
+    assert ledger.counts[cash] == 2
+
+
+@pytest.mark.unit
+def test_post_arrays_raises_on_bad_id(chart):
+    with pytest.raises(AbacusError):
+        ColumnarLedger.new(chart).post_arrays([0], [1000], [1])
+
+
+@pytest.mark.unit
+def test_post_many_raises_on_unknown_account(chart):
+    with pytest.raises(AbacusError):
+        ColumnarLedger.new(chart).post("cash", "xxx", 1)
+
+
+@pytest.mark.unit
+def test_post_compound_entry(chart):
+    entry = CompoundEntry(debits=[("cash", 12)], credits=[("sales", 10), ("equity", 2)])
+    ledger = ColumnarLedger.new(chart).post_many([entry])
+    assert ledger.balances.nonzero() == {"cash": 12, "sales": 10, "equity": 2}
+
+
+@pytest.mark.unit
+def test_starting_balances(chart):
+    ledger = ColumnarLedger.new(chart, {"cash": 10, "equity": 10})
+    assert ledger.balances.nonzero() == {"cash": 10, "equity": 10}
+    assert ledger.counts.sum() == 2
+
+
+@pytest.mark.e2e
+def test_matches_ledger(chart, entries):
+    ledger = chart.ledger().post_many(entries)
+    columnar = ColumnarLedger.new(chart).post_many(entries)
+    assert columnar.balances == ledger.balances
+    assert TrialBalance.new(columnar) == TrialBalance.new(ledger)
+    r1, r2 = Report(chart, columnar), Report(chart, ledger)
+    assert r1.balance_sheet == r2.balance_sheet
+    assert r1.income_statement == r2.income_statement
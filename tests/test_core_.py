@@ -14,6 +14,8 @@ from abacus.core import (
     CompoundEntry,
     ContraIncome,
     Entry,
+    Expense,
+    Income,
     IncomeStatement,
     Ledger,
     Pipeline,
@@ -45,11 +47,71 @@ def test_contra_pairs():
     ]
 
 
+@pytest.mark.unit
+def test_compiled_chart():
+    chart = Chart(
+        assets=["cash"],
+        income=[Account("sales", contra_accounts=["refunds", "voids"])],
+        expenses=["salaries"],
+    )
+    compiled = chart.compiled()
+    assert compiled.names[compiled.index["sales"]] == "sales"
+    assert compiled.contra_parent == {"refunds": "sales", "voids": "sales"}
+    assert compiled.is_debit[compiled.index["refunds"]] is True
+    assert compiled.names_of(Income, Expense) == ["sales", "salaries"]
+    assert chart.compiled() is compiled
+
+
+@pytest.mark.unit
+def test_compiled_chart_is_rebuilt_after_chart_change():
+    chart = Chart(assets=["cash"])
+    compiled = chart.compiled()
+    chart.assets.append("ar")
+    assert "ar" in chart.compiled().index
+    assert chart.compiled() is not compiled
+
+
+@pytest.mark.unit
+def test_compiled_chart_sees_changes_in_place():
+    chart = Chart(assets=["cash", Account("ppe", [])], capital=["equity"])
+    chart.compiled()
+    chart.assets[0] = "bank"
+    chart.assets[1].contra_accounts.append("depreciation")
+    chart.ledger().post("bank", "equity", 10)
+    assert "depreciation" in chart.ledger()
+    chart.capital[0] = "bank"
+    with pytest.raises(AbacusError):
+        chart.validate()
+
+
+@pytest.mark.unit
+def test_closing_compiles_chart_once(chart0, entries0, monkeypatch):
+    ledger = chart0.ledger().post_many(entries0)
+    calls = []
+    compiled = Chart.compiled
+
+    def spy(self):
+        calls.append(self)
+        return compiled(self)
+
+    monkeypatch.setattr(Chart, "compiled", spy)
+    Pipeline(chart0, ledger).close()
+    assert len(calls) == 1
+
+
+@pytest.mark.unit
+def test_chart_with_duplicate_names_raises():
+    with pytest.raises(AbacusError):
+        Chart(assets=["cash"], capital=["cash"])
+
+
 @pytest.mark.unit
 def test_ledger_creation_with_starting_balances():
     chart = Chart(assets=["cash"], capital=["equity"])
     ledger = Ledger.new(chart, {"cash": 100, "equity": 100})
     assert ledger.balances.nonzero() == {"cash": 100, "equity": 100}
+    assert ledger["cash"].count == ledger["equity"].count == 1
+    assert ledger[chart.null_account].count == 0
 
 
 @pytest.mark.unit
@@ -65,6 +127,51 @@ def test_ledger_condense():
     )
 
 
+@pytest.mark.unit
+def test_running_totals_account_keeps_no_amounts():
+    account = Asset(running_totals=True)
+    account.debit(300)
+    account.debit(100)
+    account.credit(200)
+    assert account.debits == []
+    assert account.credits == []
+    assert (account.debit_total, account.credit_total, account.count) == (400, 200, 3)
+    assert account.balance() == 200
+
+
+@pytest.mark.unit
+def test_running_totals_ledger_balances():
+    chart = Chart(assets=["cash"], capital=["equity"])
+    ledger = chart.ledger(running_totals=True)
+    ledger.post("cash", "equity", 100).post("cash", "equity", 50)
+    assert ledger["cash"].debits == []
+    assert ledger.balances.nonzero() == {"cash": 150, "equity": 150}
+
+
+@pytest.mark.unit
+def test_ledger_subset_keeps_ledger_order():
+    ledger = Chart(
+        assets=[Account("ppe", ["depreciation"]), "cash"], expenses=["rent"]
+    ).ledger()
+    assert ledger.names(core.DebitAccount) == ["ppe", "cash", "rent"]
+    assert list(ledger.subset(Asset).keys()) == ["ppe", "cash"]
+
+
+@pytest.mark.unit
+def test_ledger_subset_balances():
+    ledger = Ledger({"cash": Asset(), "equity": Capital()}).post("cash", "equity", 10)
+    assert ledger.subset_balances(Capital) == {"equity": 10}
+
+
+@pytest.mark.unit
+def test_ledger_type_index_follows_replaced_account():
+    ledger = Ledger({"cash": Asset(), "equity": Capital()})
+    ledger["cash"] = Capital()
+    del ledger["equity"]
+    assert ledger.names(Asset) == []
+    assert ledger.names(Capital) == ["cash"]
+
+
 @pytest.mark.unit
 def test_ledger_fails_on_unknown_account_name():
     with pytest.raises(AbacusError):
@@ -105,6 +212,70 @@ def test_pipleine(chart0, entries0):
     }
 
 
+@pytest.mark.unit
+def test_pipeline_does_not_copy_ledger(chart0, entries0):
+    ledger = chart0.ledger().post_many(entries0)
+    p = Pipeline(chart0, ledger).close()
+    assert p.ledger.base is ledger
+    assert ledger.balances["sales"] == 47
+
+
+@pytest.mark.e2e
+def test_pipeline_overlay_matches_posting_closing_entries(chart0, entries0):
+    p = Pipeline(chart0, chart0.ledger().post_many(entries0)).close()
+    expected = chart0.ledger().post_many(entries0).post_many(p.closing_entries)
+    assert p.ledger.balances == expected.balances
+    assert p.ledger.condense().balances == expected.balances
+
+
+@pytest.mark.e2e
+def test_vector_pipeline_matches_pipeline(chart0, entries0):
+    chart = Chart(
+        assets=[Account("cash"), Account("ppe", contra_accounts=["depreciation"])],
+        capital=[Account("equity", contra_accounts=["ts"])],
+        liabilities=[Account("loan", contra_accounts=["discount"])],
+        income=[Account("sales", contra_accounts=["refunds", "voids"])],
+        expenses=[Account("salaries", contra_accounts=["subsidy"]), "rent"],
+    )
+    entries = entries0 + [
+        Entry("ppe", "cash", 50),
+        Entry("depreciation", "ppe", 0),
+        Entry("depreciation", "depreciation", 1),
+        Entry("cash", "loan", 40),
+        Entry("discount", "cash", 4),
+        Entry("cash", "subsidy", 3),
+        Entry("rent", "cash", 7),
+    ]
+    ledger = chart.ledger().post_many(entries)
+    vector = core.BalanceVector.new(chart).post_many(entries)
+    p1 = Pipeline(chart, ledger)
+    p2 = core.VectorPipeline(vector)
+    for stage in ("close_first", "close_second", "close_last"):
+        getattr(p1, stage)()
+        getattr(p2, stage)()
+        assert p2.closing_entries == p1.closing_entries
+        assert p2.vector.balances == p1.ledger.balances
+    assert vector.balances == ledger.balances
+
+
+@pytest.mark.unit
+def test_balance_vector_matches_ledger(chart0, entries0):
+    vector = core.BalanceVector.new(chart0).post_many(iter(entries0))
+    ledger = chart0.ledger().post_many(entries0)
+    assert vector.balances == ledger.balances
+    assert vector.balance("refunds") == 5
+    assert (
+        Report(chart0, vector.ledger()).balance_sheet
+        == Report(chart0, ledger).balance_sheet
+    )
+
+
+@pytest.mark.unit
+def test_balance_vector_fails_on_unknown_account_name(chart0):
+    with pytest.raises(AbacusError):
+        core.BalanceVector.new(chart0).post_many([Entry("cash", "xxx", 1)])
+
+
 @pytest.fixture
 def Report0(chart0, entries0):
     ledger = chart0.ledger().post_many(entries0)
@@ -127,6 +298,27 @@ def test_income_statement(Report0):
     )
 
 
+@pytest.mark.unit
+def test_report_caches_closing_stages(Report0):
+    assert Report0.stages is Report0.stages
+
+
+@pytest.mark.unit
+def test_report_cache_is_invalidated_by_ledger_change(Report0):
+    stages = Report0.stages
+    Report0.ledger.post("cash", "equity", 1)
+    assert Report0.stages is not stages
+    assert Report0.balance_sheet.assets == {"cash": 111}
+
+
+@pytest.mark.unit
+def test_report_cache_is_invalidated_by_account_posting(Report0):
+    assert Report0.balance_sheet.assets == {"cash": 110}
+    Report0.ledger["cash"].debit(5)
+    Report0.ledger["equity"].credit(5)
+    assert Report0.balance_sheet.assets == {"cash": 115}
+
+
 @pytest.mark.e2e
 def test_current_profit(Report0):
     assert Report0.income_statement.current_profit() == 10
@@ -161,6 +353,40 @@ def test_multiple_entry_promotes():
     assert me.to_entries("null") == [Entry("cash", "null", 10), Entry("null", "eq", 10)]
 
 
+@pytest.mark.unit
+def test_compound_entry_is_posted_without_null_account():
+    chart = Chart(assets=["ar"], liabilities=["vat"], income=["sales"])
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    expected = {"ar": 12, "sales": 10, "vat": 2}
+    ledger = chart.ledger().post_one(entry)
+    assert ledger.balances.nonzero() == expected
+    assert ledger["ar"].count == 1
+    assert core.BalanceVector.new(chart).post_one(entry).balances.nonzero() == expected
+    assert (
+        core.OverlayLedger(chart.ledger()).post_one(entry).balances.nonzero()
+        == expected
+    )
+
+
+@pytest.mark.unit
+def test_compound_entry_with_unknown_account_is_not_posted():
+    chart = Chart(assets=["ar"], income=["sales"])
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    ledger = chart.ledger()
+    with pytest.raises(AbacusError):
+        ledger.post_one(entry)
+    assert ledger.balances.nonzero() == {}
+
+
+@pytest.mark.unit
+def test_parse_entry():
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    assert core.parse_entry(entry.to_json()) == entry
+    assert core.parse_entry(Entry("cash", "equity", 1).to_json()) == Entry(
+        "cash", "equity", 1
+    )
+
+
 @pytest.mark.unit
 def test_multiple_entry_from_account_balances():
     ch = Chart(assets=["cash", "inv"], capital=[Account("eq", ["ta"])])
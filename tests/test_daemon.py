@@ -0,0 +1,148 @@
+import socket
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from abacus.core import AbacusError, Entry
+from abacus.entries_store import LineJSON
+from abacus.typer_cli.daemon import Daemon, ask
+from abacus.user_chart import UserChart
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets"
+)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    chart_path = Path(tmp_path) / "chart.json"
+    UserChart.default().set_path(chart_path).use("asset:cash", "capital:equity").save()
+    store = LineJSON(Path(tmp_path) / "entries.linejson")
+    store.append(Entry("cash", "equity", 100))
+    return chart_path, store
+
+
+@pytest.fixture
+def socket_path(paths):
+    chart_path, store = paths
+    path = chart_path.parent / ".bx.sock"
+    daemon = Daemon(chart_path, store)
+    thread = threading.Thread(target=daemon.serve, args=(path,))
+    thread.start()
+    while not path.exists():
+        time.sleep(0.01)
+    yield path
+    ask({"op": "stop"}, path)
+    thread.join()
+
+
+def test_no_daemon_returns_none(tmp_path):
+    assert ask({"op": "ping"}, Path(tmp_path) / ".bx.sock") is None
+
+
+def test_post_and_balance(socket_path, paths):
+    _, store = paths
+    assert ask({"op": "balance", "name": "cash"}, socket_path) == {
+        "balance": 100,
+        "scale": 0,
+    }
+    ask(
+        {
+            "op": "post",
+            "entries": [{"debit": "cash", "credit": "equity", "amount": 50}],
+        },
+        socket_path,
+    )
+    assert ask({"op": "balance", "name": "equity"}, socket_path) == {
+        "balance": 150,
+        "scale": 0,
+    }
+    assert list(store.yield_entries())[-1] == Entry("cash", "equity", 50)
+
+
+def test_sees_entries_appended_to_store(socket_path, paths):
+    _, store = paths
+    store.append(Entry("cash", "equity", 1))
+    assert ask({"op": "balances"}, socket_path)["balances"]["cash"] == 101
+
+
+def test_reloads_changed_chart(socket_path, paths):
+    chart_path, store = paths
+    UserChart.load(chart_path).use("expense:rent").save()
+    store.append(Entry("rent", "cash", 30))
+    assert ask({"op": "balance", "name": "rent"}, socket_path) == {
+        "balance": 30,
+        "scale": 0,
+    }
+
+
+def test_rejects_unknown_account(socket_path, paths):
+    _, store = paths
+    with pytest.raises(AbacusError):
+        ask(
+            {
+                "op": "post",
+                "entries": [{"debit": "cash", "credit": "xxx", "amount": 1}],
+            },
+            socket_path,
+        )
+    assert len(list(store.yield_entries())) == 1
+
+
+def test_post_compound_entry(socket_path, paths):
+    _, store = paths
+    entry = {"debits": [["cash", 3]], "credits": [["equity", 2], ["equity", 1]]}
+    ask({"op": "post", "entries": [entry]}, socket_path)
+    assert ask({"op": "balance", "name": "cash"}, socket_path) == {
+        "balance": 103,
+        "scale": 0,
+    }
+    assert len(list(store.yield_entries())) == 2
+
+
+def test_post_with_title_and_date(socket_path, paths):
+    from abacus.meta import Meta, MetaStore
+
+    _, store = paths
+    offset = store.next_id()
+    entry = {"debit": "cash", "credit": "equity", "amount": 1}
+    request = {"op": "post", "entries": [entry], "date": "2024-01-05", "title": "X"}
+    assert ask(request, socket_path) == {"posted": 1}
+    meta = MetaStore(store.path).get(offset)
+    assert meta == Meta(offset, date(2024, 1, 5), "X")
+
+
+def test_ping_returns_served_files(socket_path, paths):
+    chart_path, store = paths
+    assert ask({"op": "ping"}, socket_path) == {
+        "chart": str(chart_path.resolve()),
+        "store": str(store.path.resolve()),
+    }
+
+
+def test_daemon_serving_other_files_is_ignored(socket_path, paths):
+    chart_path, _ = paths
+    other = {"chart": str(chart_path.resolve()), "store": "/elsewhere.sqlite"}
+    assert ask({"op": "balances"}, socket_path, files=other) is None
+
+
+def test_hung_daemon_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr("abacus.typer_cli.daemon.TIMEOUT", 0.1)
+    path = Path(tmp_path) / ".bx.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        assert ask({"op": "ping"}, path) is None
+
+
+def test_assert_unknown_account_exits_with_message(socket_path, monkeypatch):
+    from abacus.typer_cli.main import assert_balance
+
+    monkeypatch.chdir(socket_path.parent)
+    with pytest.raises(SystemExit) as e:
+        assert_balance("nosuch", "1")
+    assert e.value.code == "Account nosuch not in chart."
+    assert_balance("cash", "100")
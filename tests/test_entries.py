@@ -2,7 +2,7 @@ from pathlib import Path
 
 import pytest
 
-from abacus.core import Chart, Entry
+from abacus.core import Chart, CompoundEntry, Entry
 from abacus.entries_store import LineJSON
 
 
@@ -19,6 +19,14 @@ def test_yield_entries(path):
     assert list(store.yield_entries()) == [e1, e2]
 
 
+def test_compound_entry_is_one_line(path):
+    store = LineJSON(path)
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    store.append_many([Entry("cash", "equity", 1), entry])
+    assert len(path.read_text().splitlines()) == 2
+    assert list(store.yield_entries())[1] == entry
+
+
 def test_yield_entries_for_income_statement(path):
     path.touch()
     store = LineJSON(path)
@@ -28,3 +36,105 @@ def test_yield_entries_for_income_statement(path):
     store.append(e2)
     chart = Chart("isa", "re", "null")
     assert list(store.yield_entries_for_income_statement(chart)) == [e1]
+
+
+def test_fold_for_report_reads_store_once(path):
+    from abacus.typer_cli.base import fold_for_report
+
+    path.touch()
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "sales", 10), Entry("sales", "isa", 10)])
+    chart = Chart("isa", "re", "null", assets=["cash"], income=["sales"])
+    all_entries, without_isa = fold_for_report(chart, store)
+    assert all_entries.balances.nonzero() == {"cash": 10, "isa": 10}
+    assert without_isa.balances.nonzero() == {"cash": 10, "sales": 10}
+
+
+@pytest.fixture
+def chart_cash():
+    return Chart(assets=["cash"], capital=["equity"])
+
+
+def fold_cash(store, chart, every):
+    from abacus.core import BalanceVector
+
+    vector = BalanceVector.new(chart)
+    store.fold("balances", [vector], vector.post_one, every=every)
+    return vector.balances.nonzero()
+
+
+def test_fold_writes_and_uses_checkpoint(path, chart_cash):
+    path.touch()
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "equity", 10), Entry("cash", "equity", 5)])
+    assert fold_cash(store, chart_cash, every=1) == {"cash": 15, "equity": 15}
+    checkpoint = store.read_checkpoints()["balances"]
+    assert (checkpoint.lines, checkpoint.offset) == (2, path.stat().st_size)
+    store.append(Entry("cash", "equity", 1))
+    assert fold_cash(store, chart_cash, every=1) == {"cash": 16, "equity": 16}
+    assert store.read_checkpoints()["balances"].lines == 3
+
+
+def test_fold_ignores_checkpoint_after_truncation(path, chart_cash):
+    path.touch()
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "equity", 10), Entry("cash", "equity", 5)])
+    fold_cash(store, chart_cash, every=1)
+    path.write_text("")
+    store.append(Entry("cash", "equity", 1))
+    assert fold_cash(store, chart_cash, every=1000) == {"cash": 1, "equity": 1}
+
+
+def test_fold_ignores_checkpoint_after_rewrite(path, chart_cash):
+    path.touch()
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "equity", 10), Entry("cash", "equity", 5)])
+    fold_cash(store, chart_cash, every=1)
+    path.write_text("")
+    store.append_many([Entry("cash", "equity", 20), Entry("cash", "equity", 5)])
+    assert fold_cash(store, chart_cash, every=1000) == {"cash": 25, "equity": 25}
+
+
+def test_fold_ignores_checkpoint_after_rewrite_in_the_middle(path, chart_cash):
+    path.touch()
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "equity", 10)] * 2000)
+    fold_cash(store, chart_cash, every=1)
+    lines = path.read_text().splitlines(keepends=True)
+    lines[1000] = lines[1000].replace("10", "99")
+    path.write_text("".join(lines))
+    assert fold_cash(store, chart_cash, every=1000) == {"cash": 20089, "equity": 20089}
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 50])
+def test_line_ranges_cover_file_at_line_boundaries(path, parts):
+    store = LineJSON(path)
+    store.append_many([Entry("cash", "equity", 10**k) for k in range(10)])
+    size = path.stat().st_size
+    ranges = store.line_ranges(0, size, parts)
+    assert ranges[0][0] == 0 and ranges[-1][1] == size
+    assert all(b == c for (_, b), (c, _) in zip(ranges, ranges[1:]))
+    content = path.read_bytes()
+    assert all(content[b - 1 : b] == b"\n" for _, b in ranges)
+    entries = [e for a, b in ranges for _, e in store.yield_entries_from(a, b)]
+    assert entries == list(store.yield_entries())
+
+
+def test_fold_report_parallel_matches_serial_fold(path):
+    from abacus.parallel import fold_report_parallel
+    from abacus.typer_cli.base import fold_for_report
+
+    store = LineJSON(path)
+    chart = Chart("isa", "re", "null", assets=["cash"], income=["sales"])
+    store.append_many(
+        [Entry("cash", "sales", k) for k in range(1, 200)]
+        + [Entry("sales", "isa", 19900)]
+        + [CompoundEntry(debits=[("cash", 5)], credits=[("sales", 5)])]
+    )
+    expected = [v.net for v in fold_for_report(chart, store)]
+    result = fold_report_parallel(chart, store, jobs=4, every=1, min_range_size=100)
+    assert [v.net for v in result] == expected
+    assert store.read_checkpoints()["report:isa"].lines == 201
+    store.append(Entry("cash", "sales", 1))
+    result = fold_report_parallel(chart, store, jobs=4, every=1, min_range_size=100)
+    assert result[0].balance("cash") == 19906
@@ -0,0 +1,89 @@
+"""Guard `bx` startup time: measure imports with `python -X importtime`."""
+
+import subprocess
+import sys
+
+import pytest
+
+from abacus.core import Entry
+from abacus.entries_store import LineJSON
+from abacus.user_chart import UserChart
+
+# microseconds, `bx assert` imports take about 90 ms
+BUDGET = 200_000
+ASSERT_PATH = "from abacus.typer_cli.main import main; main(['assert', 'cash', '10'])"
+
+
+def importtime(statement: str, cwd=None) -> list[tuple[str, int]]:
+    """Return module names with leading spaces for nested imports
+    and cumulative import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((name[1:], int(cumulative)))
+    return rows
+
+
+def imports(statement: str, cwd=None) -> dict[str, int]:
+    """Return cumulative import time in microseconds by module name."""
+    return {name.strip(): t for name, t in importtime(statement, cwd)}
+
+
+def top_level(modules) -> set[str]:
+    return {name.split(".")[0] for name in modules}
+
+
+@pytest.mark.regression
+def test_bx_entry_point_does_not_import_typer_rich_pydantic():
+    modules = top_level(imports("import abacus.typer_cli.main"))
+    assert not modules & {"typer", "click", "rich", "pydantic"}
+
+
+@pytest.mark.regression
+def test_daemon_client_does_not_import_pydantic():
+    modules = top_level(imports("from abacus.typer_cli.daemon import ask"))
+    assert not modules & {"typer", "click", "rich", "pydantic"}
+
+
+@pytest.mark.regression
+def test_app_does_not_import_viewers_and_pydantic():
+    modules = imports("import abacus.typer_cli.app")
+    assert "abacus.viewers" not in modules
+    assert "pydantic" not in top_level(modules)
+
+
+@pytest.fixture
+def project(tmp_path):
+    UserChart.default().set_path(tmp_path / "chart.json").use(
+        "asset:cash", "capital:equity"
+    ).save()
+    LineJSON(tmp_path / "entries.linejson").append(Entry("cash", "equity", 10))
+    # first run writes chart cache
+    importtime(ASSERT_PATH, tmp_path)
+    return tmp_path
+
+
+@pytest.mark.regression
+def test_bx_assert_imports_only_what_it_needs(project):
+    modules = imports(ASSERT_PATH, project)
+    assert not top_level(modules) & {"typer", "click", "rich", "pydantic", "sqlite3"}
+    for name in ["binary_store", "sqlite_store", "postings", "asof", "meta"]:
+        assert f"abacus.{name}" not in modules
+
+
+@pytest.mark.regression
+def test_bx_assert_import_budget(project):
+    rows = importtime(ASSERT_PATH, project)
+    # time of modules imported directly by the statement, nested ones included
+    total = sum(t for name, t in rows if not name.startswith(" "))
+    assert total < BUDGET
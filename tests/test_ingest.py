@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+
+from abacus.core import AbacusError, CompoundEntry, Entry
+from abacus.entries_store import LineJSON
+from abacus.typer_cli.ingest import ingest, read_records
+from abacus.user_chart import UserChart
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = Path(tmp_path) / "entries.csv"
+    path.write_text(
+        "id,debit,credit,amount\n"
+        ",asset:cash,capital:equity,5\n"
+        "7,asset:ar,,12\n"
+        "7,,income:sales,10\n"
+        "7,,liability:vat,2\n"
+    )
+    return path
+
+
+def test_read_csv(csv_file):
+    assert list(read_records(csv_file)) == [
+        Entry("asset:cash", "capital:equity", 5),
+        CompoundEntry(
+            debits=[("asset:ar", 12)],
+            credits=[("income:sales", 10), ("liability:vat", 2)],
+        ),
+    ]
+
+
+def test_read_jsonl(tmp_path):
+    path = Path(tmp_path) / "entries.jsonl"
+    path.write_text(
+        '{"debit": "cash", "credit": "equity", "amount": 5}\n'
+        '{"debits": [["ar", 12]], "credits": [["sales", 12]]}\n'
+    )
+    assert list(read_records(path)) == [
+        Entry("cash", "equity", 5),
+        CompoundEntry(debits=[("ar", 12)], credits=[("sales", 12)]),
+    ]
+
+
+@pytest.fixture
+def project(tmp_path):
+    chart_file = Path(tmp_path) / "chart.json"
+    UserChart.default().set_path(chart_file).save()
+    store_file = Path(tmp_path) / "entries.linejson"
+    store_file.touch()
+    return chart_file, store_file
+
+
+def test_ingest_adds_accounts_and_posts(csv_file, project):
+    chart_file, store_file = project
+    assert ingest(csv_file, chart_file, store_file, batch_size=2) == 2
+    assert "vat" in UserChart.load(chart_file).account_labels
+    assert list(LineJSON(store_file).yield_entries()) == [
+        Entry("cash", "equity", 5),
+        CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)]),
+    ]
+
+
+def test_ingest_writes_nothing_for_unknown_account(tmp_path, project):
+    chart_file, store_file = project
+    path = Path(tmp_path) / "entries.jsonl"
+    path.write_text(
+        '{"debit": "asset:cash", "credit": "capital:equity", "amount": 5}\n'
+        '{"debit": "xxx", "credit": "cash", "amount": 1}\n'
+    )
+    with pytest.raises(AbacusError):
+        ingest(path, chart_file, store_file)
+    assert store_file.read_text() == ""
+
+
+def test_read_jsonl_decimal_amounts(tmp_path):
+    path = Path(tmp_path) / "entries.jsonl"
+    path.write_text('{"debit": "cash", "credit": "equity", "amount": 1.10}\n')
+    assert list(read_records(path, scale=2)) == [Entry("cash", "equity", 110)]
+
+
+def test_csv_leg_without_id_raises(tmp_path):
+    path = Path(tmp_path) / "entries.csv"
+    path.write_text("debit,credit,amount\nar,,12\n,sales,12\n")
+    with pytest.raises(AbacusError):
+        list(read_records(path))
+
+
+def test_ingest_conflicting_labels_raises(tmp_path, project):
+    chart_file, store_file = project
+    path = Path(tmp_path) / "entries.csv"
+    path.write_text(
+        "debit,credit,amount\nasset:x,capital:equity,1\nasset:x,income:x,1\n"
+    )
+    with pytest.raises(AbacusError):
+        ingest(path, chart_file, store_file)
+    assert "x" not in UserChart.load(chart_file).account_labels
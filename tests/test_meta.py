@@ -0,0 +1,79 @@
+import datetime
+from pathlib import Path
+
+import pytest
+
+from abacus.binary_store import BinaryStore
+from abacus.core import CompoundEntry, Entry
+from abacus.entries_store import LineJSON
+from abacus.meta import Meta, MetaStore, TitleHeap, date_from_int, date_to_int
+from abacus.sqlite_store import SQLiteStore
+from abacus.typer_cli.base import append_with_meta
+
+
+def test_title_heap_writes_each_title_once(tmp_path):
+    heap = TitleHeap(Path(tmp_path) / "titles")
+    a, b, a2 = heap.intern_many(["Invoice", "Сбор", "Invoice"])
+    assert a == a2 != b
+    size = heap.path.stat().st_size
+    assert TitleHeap(heap.path).intern_many(["Сбор", "Invoice"]) == [b, a]
+    assert heap.path.stat().st_size == size
+    [c] = heap.intern_many(["New"])
+    assert c == size
+    assert heap.read_many([a, b, c, -1]) == {a: "Invoice", b: "Сбор", c: "New"}
+
+
+def test_title_index_is_rebuilt_from_heap(tmp_path):
+    heap = TitleHeap(Path(tmp_path) / "titles")
+    a, b = heap.intern_many(["a", "b"])
+    heap.index_path.unlink()
+    assert heap.intern_many(["b", "a"]) == [b, a]
+    # heap appended without index, as after an interrupted append
+    with open(heap.path, "ab") as file:
+        file.write(b"\x01\x00\x00\x00c")
+    size = heap.path.stat().st_size
+    assert heap.intern_many(["c", "a"]) == [size - 5, a]
+
+
+def test_title_index_grows(tmp_path):
+    heap = TitleHeap(Path(tmp_path) / "titles")
+    titles = [f"title {i}" for i in range(3000)]
+    offsets = heap.intern_many(titles)
+    assert heap.intern_many(reversed(titles)) == offsets[::-1]
+    assert heap.read_many(offsets[:2]) == {offsets[0]: "title 0", offsets[1]: "title 1"}
+
+
+def test_date_round_trip():
+    d = datetime.date(2024, 12, 31)
+    assert date_from_int(date_to_int(d)) == d
+    assert date_from_int(date_to_int(None)) is None
+
+
+@pytest.mark.parametrize(
+    "store_class, name",
+    [(LineJSON, "e.linejson"), (BinaryStore, "e.bin"), (SQLiteStore, "e.sqlite")],
+)
+def test_append_with_meta(tmp_path, store_class, name):
+    store = store_class(Path(tmp_path) / name)
+    d = datetime.date(2024, 1, 5)
+    first = store.next_id()
+    append_with_meta(store, [Entry("cash", "equity", 10)], d, "Investment")
+    second = store.next_id()
+    append_with_meta(store, [Entry("cash", "equity", 5)])
+    third = store.next_id()
+    append_with_meta(store, [Entry("ar", "sales", 3)], title="Invoice")
+    assert len({first, second, third}) == 3
+    metas = MetaStore(store.path)
+    assert list(metas.yield_meta()) == [
+        Meta(first, d, "Investment"),
+        Meta(third, None, "Invoice"),
+    ]
+    assert metas.get(third) == Meta(third, None, "Invoice")
+    assert metas.get(second) is None
+
+
+def test_compound_entry_meta_in_sqlite(tmp_path):
+    store = SQLiteStore(Path(tmp_path) / "e.sqlite")
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    append_with_meta(store, [entry], title="Invoice")
+    assert MetaStore(store.path).get(1) == Meta(1, None, "Invoice")
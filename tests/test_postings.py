@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+
+from abacus.binary_store import BinaryStore
+from abacus.core import CompoundEntry, Entry
+from abacus.entries_store import LineJSON
+from abacus.postings import PostingIndex
+from abacus.sqlite_store import SQLiteStore
+from abacus.typer_cli.base import append_with_meta
+
+
+@pytest.fixture(
+    params=[(LineJSON, "e.linejson"), (BinaryStore, "e.bin"), (SQLiteStore, "e.sqlite")]
+)
+def store(request, tmp_path):
+    store_class, name = request.param
+    store = store_class(Path(tmp_path) / name)
+    store.append_many(
+        [
+            Entry("cash", "equity", 100),
+            Entry("ar", "sales", 12),
+            Entry("cash", "ar", 5),
+            Entry("cash", "ar", 7),
+        ]
+    )
+    return store
+
+
+def test_postings_with_running_balance(store):
+    index = PostingIndex(store).update()
+    assert index.count("ar") == 3
+    ids = [id for id, _ in store.yield_entries_with_ids()]
+    assert index.postings("ar") == [
+        (ids[1], 12, 12),
+        (ids[2], -5, 7),
+        (ids[3], -7, 0),
+    ]
+    assert index.postings("ar", start=1, count=1) == [(ids[2], -5, 7)]
+    assert store.entry_at(ids[2]) == Entry("cash", "ar", 5)
+    assert index.postings("xxx") == []
+
+
+def test_index_is_extended_on_append(store):
+    index = PostingIndex(store).update()
+    append_with_meta(store, [Entry("cash", "equity", 1)])
+    assert index.postings("cash", start=3)[0][1:] == (1, 113)
+
+
+def test_index_is_rebuilt_after_rewrite(tmp_path):
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    store.append(Entry("cash", "equity", 100))
+    PostingIndex(store).update()
+    store.path.write_text("")
+    store.append(Entry("cash", "equity", 3))
+    assert PostingIndex(store).update().postings("cash") == [(0, 3, 3)]
+
+
+def test_compound_entry_is_one_posting(tmp_path):
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    store.append(entry)
+    index = PostingIndex(store).update()
+    assert index.postings("sales") == [(0, -10, -10)]
+
+
+def test_update_flushes_records_in_batches(store):
+    index = PostingIndex(store).update(flush_every=1)
+    assert [x[1:] for x in index.postings("cash")] == [(100, 100), (5, 105), (7, 112)]
+
+
+def test_interrupted_update_is_recovered(tmp_path):
+    store = LineJSON(Path(tmp_path) / "e.linejson")
+    store.append(Entry("cash", "equity", 100))
+    PostingIndex(store).update()
+    store.append_many([Entry("ar", "sales", 13), Entry("cash", "ar", 13)])
+    index = PostingIndex(store)
+    entries = store.yield_entries_with_ids
+
+    def interrupted(start):
+        for n, item in enumerate(entries(start)):
+            if n == 1:
+                raise KeyboardInterrupt
+            yield item
+
+    store.yield_entries_with_ids = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        index.update(flush_every=1)
+    del store.yield_entries_with_ids
+    index.update()
+    assert [x[1:] for x in index.postings("ar")] == [(13, 13), (-13, 0)]
+    assert [x[1:] for x in index.postings("cash")] == [(100, 100), (13, 113)]
+    assert not (index.path / "updating").exists()
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+
+from abacus.core import AbacusError, BalanceVector, Chart, CompoundEntry, Entry
+from abacus.sqlite_store import SQLiteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(Path(tmp_path) / "entries.sqlite")
+
+
+@pytest.fixture
+def entries():
+    return [
+        Entry("cash", "equity", 100),
+        Entry("cash", "sales", 30),
+        Entry("sales", "isa", 30),
+    ]
+
+
+def test_yield_entries(store, entries):
+    store.append_many(entries)
+    store.append(Entry("cash", "equity", 1))
+    assert list(store.yield_entries()) == entries + [Entry("cash", "equity", 1)]
+
+
+def test_net_balances(store, entries):
+    store.append_many(entries)
+    assert store.net_balances() == {
+        "cash": 130,
+        "equity": -100,
+        "sales": 0,
+        "isa": -30,
+    }
+
+
+def test_net_balances_exclude(store, entries):
+    store.append_many(entries)
+    assert store.net_balances(exclude="isa") == {
+        "cash": 130,
+        "equity": -100,
+        "sales": -30,
+    }
+
+
+def test_balance_vector_from_net_balances(store, entries):
+    store.append_many(entries)
+    chart = Chart("isa", "re", "null", assets=["cash"], capital=["equity"])
+    with pytest.raises(AbacusError):
+        BalanceVector.new(chart).add_net(store.net_balances())
+    chart.income = ["sales"]
+    vector = BalanceVector.new(chart).add_net(store.net_balances())
+    assert vector.balances.nonzero() == {"cash": 130, "equity": 100, "isa": 30}
+
+
+def test_compound_entry_is_one_transaction(store, entries):
+    entry = CompoundEntry(debits=[("ar", 12)], credits=[("sales", 10), ("vat", 2)])
+    store.append_many(entries[:1] + [entry] + entries[1:])
+    assert list(store.yield_entries()) == entries[:1] + [entry] + entries[1:]
+    assert store.net_balances(exclude="isa")["vat"] == -2
+
+
+def _append_one_by_one(path, n):
+    store = SQLiteStore(path)
+    for _ in range(n):
+        store.append_many([Entry("cash", "equity", 1)])
+
+
+def test_concurrent_writers_get_distinct_transactions(store):
+    import multiprocessing
+
+    store.append_many([])
+    workers = [
+        multiprocessing.Process(target=_append_one_by_one, args=(store.path, 50))
+        for _ in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    entries = list(store.yield_entries())
+    assert len(entries) == 200
+    assert all(isinstance(e, Entry) for e in entries)
+
+
+def test_append_many_returns_first_transaction(store, entries):
+    assert store.append_many(entries) == 1
+    assert store.append_many(entries) == 4
+    assert store.next_id() == 7
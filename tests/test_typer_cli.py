@@ -6,6 +6,7 @@ from shlex import split
 import pytest
 from typer.testing import CliRunner
 
+from abacus.core import AbacusError
 from abacus.typer_cli.app import app
 
 runner = CliRunner()
@@ -190,3 +191,85 @@ def test_ledger_create_and_delete_files():
         result = runner.invoke(app, ["ledger", "unlink", "--yes"])
         assert result.exit_code == 0
         assert not b.exists()
+
+
+@pytest.mark.cli
+def test_decimal_amounts_with_chart_scale():
+    with runner.isolated_filesystem():
+        for line in [
+            "init",
+            "chart set --scale 2",
+            "ledger post asset:cash capital:equity 100.25",
+            "ledger post cash equity 0.5",
+            "assert cash 100.75",
+        ]:
+            result = runner.invoke(app, split(line))
+            assert result.exit_code == 0, result.stdout
+        assert Path("entries.linejson").read_text().count("10025") == 1
+        result = runner.invoke(app, split("show balances --nonzero"))
+        assert result.stdout.strip() == '{"cash": "100.75", "equity": "100.75"}'
+        result = runner.invoke(app, split("ledger post cash equity 0.001"))
+        assert result.exit_code == 1
+        result = runner.invoke(app, split("chart set --scale 3"))
+        assert result.exit_code == 1
+        assert "not empty" in result.output
+
+
+@pytest.mark.cli
+def test_show_account_pages():
+    with runner.isolated_filesystem():
+        for line in [
+            "init",
+            "ledger post asset:cash capital:equity 10",
+            "ledger post cash equity 5",
+            "ledger post expense:rent cash 3",
+        ]:
+            assert runner.invoke(app, split(line)).exit_code == 0
+        result = runner.invoke(app, split("show account cash --page -1 --page-size 2"))
+        assert result.exit_code == 0
+        assert '"credit": 3, "balance": 12' in result.stdout
+        assert "Page 2 of 2." in result.output
+        for page in ["0", "-2"]:
+            result = runner.invoke(app, ["show", "account", "cash", "--page", page])
+            assert result.exit_code == 1
+
+
+@pytest.mark.cli
+def test_load_and_close_write_one_transaction_each():
+    with runner.isolated_filesystem():
+        for line in [
+            "init",
+            "chart add --asset cash",
+            "chart add --capital equity",
+            "chart add --income sales",
+        ]:
+            assert runner.invoke(app, split(line)).exit_code == 0, line
+        Path("start.json").write_text('{"cash": 10, "equity": 8, "sales": 2}')
+        assert runner.invoke(app, split("ledger load start.json")).exit_code == 0
+        assert len(Path("entries.linejson").read_text().splitlines()) == 1
+        assert runner.invoke(app, split("show account cash")).exit_code == 0
+        assert runner.invoke(app, split("close")).exit_code == 0
+        result = runner.invoke(app, split("show account sales"))
+        assert '"balance": 0' in result.stdout
+        result = runner.invoke(app, split("ledger load missing.json"))
+        assert result.exit_code != 0
+
+
+@pytest.mark.cli
+def test_ledger_show_output_can_be_ingested():
+    with runner.isolated_filesystem():
+        for line in [
+            "init",
+            "chart set --scale 2",
+            "ledger post asset:cash capital:equity 100.50",
+        ]:
+            assert runner.invoke(app, split(line)).exit_code == 0, line
+        result = runner.invoke(app, split("ledger show"))
+        assert '"amount": "100.50"' in result.stdout
+        Path("out.jsonl").write_text(result.stdout)
+        assert runner.invoke(app, split("ingest out.jsonl")).exit_code == 0
+        assert runner.invoke(app, split("assert cash 201")).exit_code == 0
+        for args in ["assert cash 96.255", "assert nosuch 1"]:
+            result = runner.invoke(app, split(args))
+            assert result.exit_code == 1
+            assert not isinstance(result.exception, (KeyError, AbacusError))
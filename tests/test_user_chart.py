@@ -2,7 +2,14 @@ import pytest
 
 import abacus.core as core
 from abacus.core import AbacusError, Account, T
-from abacus.user_chart import Composer, Label, Offset, extract, make_user_chart
+from abacus.user_chart import (
+    Composer,
+    Label,
+    Offset,
+    UserChart,
+    extract,
+    make_user_chart,
+)
 
 
 def test_extract_label():
@@ -82,3 +89,41 @@ def test_capital_property(chart1):
 def test_no_account_for_offset_raises():
     with pytest.raises(AbacusError):
         make_user_chart("isa", "re", "null").use("contra:equity:ts")
+
+
+@pytest.mark.unit
+def test_use_many():
+    user_chart = (
+        UserChart.default()
+        .use_many(["cash", "ar"], prefix="asset")
+        .use_many(["capital:equity", "contra:equity:ts"])
+    )
+    assert user_chart.name_set == set(user_chart.names)
+    assert user_chart.chart().compiled().contra_parent == {"ts": "equity"}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "labels",
+    [
+        ["asset:cash", "asset:cash"],
+        ["asset:cash", "capital:_isa"],
+        ["asset:cash", "contra:equity:ts"],
+        ["asset:cash", "contra:cash:ar", "asset:ar"],
+    ],
+)
+def test_use_many_does_not_change_chart_on_error(labels):
+    user_chart = UserChart.default()
+    with pytest.raises(AbacusError):
+        user_chart.use_many(labels)
+    assert user_chart.account_labels == {}
+    assert user_chart.name_set == set(user_chart.names)
+
+
+@pytest.mark.unit
+def test_name_set_follows_special_accounts():
+    user_chart = UserChart.default().use("asset:cash")
+    user_chart.set_isa("profit")
+    assert user_chart.name_set == set(user_chart.names)
+    with pytest.raises(AbacusError):
+        user_chart.use("income:profit")